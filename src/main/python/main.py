@@ -4,19 +4,26 @@ import os
 from fbs_runtime.application_context.PyQt5 import ApplicationContext
 from PyQt5.QtWidgets import QApplication
 
+from ui.services.startup import timer
 from ui.main_window import MainWindow  # your custom main window
 from ui.splash_screen import SplashScreen
 
 class AppLauncher:
     def __init__(self):
+        timer.begin("qt init")
         self.appctxt = ApplicationContext()   # 1. Instantiate ApplicationContext
         self.app = QApplication(sys.argv)
         self.splash = SplashScreen()
+        timer.end("qt init")
 
     def launch_main(self):
+        timer.begin("main window")
         self.window = MainWindow()   # keeping reference to prevent garbage collection
+        timer.end("main window")
         self.window.show()
         self.splash.finish(self.window)    # Qt to clean up splash properly
+        timer.mark("window shown")
+        print(timer.report())
         
     def run(self):
         self.splash.start(self.launch_main)    
@@ -0,0 +1,16 @@
+# Locations shipped with the app: the initial selection of the location
+# server and its presets, which the compare page also starts with. Kept free
+# of Flask so the GUI can import it.
+
+DEFAULT_SELECTED = {"name": "Kolkata, India", "lat": 22.5726, "lon": 88.3639}
+
+PRESETS = {
+    "Delhi": {"lat": 28.6139, "lon": 77.2090},
+    "Mumbai": {"lat": 19.0760, "lon": 72.8777},
+    "Chennai": {"lat": 13.0827, "lon": 80.2707},
+    "Ranchi": {"lat": 23.3441, "lon": 85.3096},
+    "Bangalore": {"lat": 12.9716, "lon": 77.5946},
+    "Hyderabad": {"lat": 17.3850, "lon": 78.4867},
+    "Jaipur": {"lat": 26.9124, "lon": 75.7873},
+    "Lucknow": {"lat": 26.8467, "lon": 80.9462},
+}
@@ -1,81 +1,257 @@
+import argparse
+import atexit
+import copy
 import json
+import logging
 import os
-from flask import Flask, request, jsonify
+import tempfile
+import threading
+import time
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
+try:
+    from ui.location_presets import DEFAULT_SELECTED, PRESETS
+except ImportError:   # started as a script from this directory
+    from location_presets import DEFAULT_SELECTED, PRESETS
+
 app = Flask(__name__)
 CORS(app)
 
+logger = logging.getLogger("location_server")
+
 # JSON file path
 LOCATION_FILE = "location.json"
+FLUSH_DELAY = 1.0   # seconds to batch updates before writing them to disk
+MAX_BATCH = 10000   # locations accepted in one batch request
 
 # Default location data
 def get_default_location():
     return {
-        "selected": {
-            "name": "Kolkata, India",
-            "lat": 22.5726,
-            "lon": 88.3639
-        },
-        "presets": {
-            "Delhi": {"lat": 28.6139, "lon": 77.2090},
-            "Mumbai": {"lat": 19.0760, "lon": 72.8777},
-            "Chennai": {"lat": 13.0827, "lon": 80.2707},
-            "Ranchi": {"lat": 23.3441, "lon": 85.3096},
-            "Bangalore": {"lat": 12.9716, "lon": 77.5946},
-            "Hyderabad": {"lat": 17.3850, "lon": 78.4867},
-            "Jaipur": {"lat": 26.9124, "lon": 75.7873},
-            "Lucknow": {"lat": 26.8467, "lon": 80.9462}
-        }
+        "selected": dict(DEFAULT_SELECTED),
+        "presets": copy.deepcopy(PRESETS),
     }
 
-# Initialize JSON file if not exists
-if not os.path.exists(LOCATION_FILE):
-    with open(LOCATION_FILE, "w") as f:
-        json.dump(get_default_location(), f, indent=4)
 
-@app.route("/location", methods=[POST])
+class LocationStore:
+    """Location state kept in memory, persisted with a debounced atomic write.
+
+    Requests only touch the in-memory dict under a lock; a burst of POSTs
+    results in a single write of the file once FLUSH_DELAY has passed.
+    """
+
+    def __init__(self, path=LOCATION_FILE, flush_delay=FLUSH_DELAY):
+        self.path = path
+        self.flush_delay = flush_delay
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._versions = {}
+        self._epoch = f"{int(time.time()):x}"   # keeps ETags unique across restarts
+        self._rendered = {}   # key -> (version, etag, body) of the last serialized section
+        self.data = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            # Initialize JSON file if not exists
+            data = get_default_location()
+            self._write(json.dumps(data, indent=4))
+            return data
+        except ValueError as e:
+            # Keep the damaged file next to the new one instead of overwriting the user's data
+            corrupt_path = self.path + ".corrupt"
+            logger.error("%s is not valid JSON (%s); moved it to %s", self.path, e, corrupt_path)
+            os.replace(self.path, corrupt_path)
+            data = get_default_location()
+            self._write(json.dumps(data, indent=4))
+            return data
+        except OSError as e:
+            # Unreadable but present: serve defaults and leave the file alone until something is saved
+            logger.error("cannot read %s (%s); starting from defaults", self.path, e)
+            return get_default_location()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return copy.deepcopy(self.data.get(key, default))
+
+    def get_rendered(self, key, default=None):
+        """Serialized section and its ETag; re-encoded only after it changed."""
+        with self._lock:
+            version = self._versions.get(key, 0)
+            cached = self._rendered.get(key)
+            if cached is None or cached[0] != version:
+                body = json.dumps(self.data.get(key) or default)
+                cached = (version, f"{key}-{self._epoch}-{version}", body)   # unquoted, see set_etag
+                self._rendered[key] = cached
+            return cached[1], cached[2]
+
+    def set(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self._changed(key)
+
+    def merge(self, key, entries):
+        with self._lock:
+            self.data.setdefault(key, {}).update(entries)
+            self._changed(key)
+
+    def _changed(self, key):
+        # Caller holds self._lock
+        self._versions[key] = self._versions.get(key, 0) + 1
+        self._dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        # Caller holds self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        # Snapshot and write under one write lock, so files land in the order the snapshots were taken
+        with self._write_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return
+                payload = json.dumps(self.data, indent=4)
+                self._dirty = False
+            try:
+                self._write(payload)
+            except OSError as e:
+                logger.error("cannot save %s (%s); will retry", self.path, e)
+                with self._lock:
+                    self._dirty = True
+                    self._schedule_flush()
+
+    def _write(self, payload):
+        # Temp file + rename: readers never see a partially written file
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+store = LocationStore()
+atexit.register(store.flush)
+
+def json_with_etag(key, default):
+    etag, body = store.get_rendered(key, default)
+    response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    # Answers 304 without the body when If-None-Match carries the current tag
+    return response.make_conditional(request)
+
+def parse_location(entry):
+    lat = float(entry["lat"])
+    lon = float(entry["lon"])
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("coordinates out of range")
+    return {"lat": lat, "lon": lon}
+
+@app.route("/location", methods=["POST"])
 def update_location():
     try:
-        lat = float(request.args.get("lat"))
-        lon = float(request.args.get("lon"))
+        location = parse_location(request.args)
         name = request.args.get("name", "Unknown Location")
 
-        with open(LOCATION_FILE, "r") as f:
-            data = json.load(f)
-
-        data["selected"] = {
+        store.set("selected", {
             "name": name,
-            "lat": lat,
-            "lon": lon
-        }
-
-        with open(LOCATION_FILE, "w") as f:
-            json.dump(data, f, indent=4)
+            "lat": location["lat"],
+            "lon": location["lon"]
+        })
 
-        print(f"[Location Saved] {name} - {lat}, {lon}")
-        return jsonify({"status": "success", "lat": lat, "lon": lon})
+        logger.debug("[Location Saved] %s - %s, %s", name, location["lat"], location["lon"])
+        return jsonify({"status": "success", "lat": location["lat"], "lon": location["lon"]})
     except Exception as e:
-        print("[Error Saving Location]", str(e))
+        logger.warning("[Error Saving Location] %s", e)
         return jsonify({"status": "error", "message": str(e)}), 400
 
+@app.route("/location/batch", methods=["POST"])
+def update_locations_batch():
+    # Body: {"locations": {"<name>": {"lat": .., "lon": ..}, ...}} or a list of {"name", "lat", "lon"}
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        return jsonify({"status": "error", "message": "expected a JSON object"}), 400
+    locations = body.get("locations")
+    if isinstance(locations, (dict, list)) and len(locations) > MAX_BATCH:
+        return jsonify({"status": "error", "message": f"at most {MAX_BATCH} locations per batch"}), 413
+
+    accepted, errors = {}, {}
+    if isinstance(locations, list):
+        items = {}
+        for i, item in enumerate(locations):
+            name = item.get("name") if isinstance(item, dict) else None
+            if isinstance(name, str) and name:
+                items[name] = item
+            else:
+                errors[f"#{i}"] = "missing name"
+        locations = items
+    if not isinstance(locations, dict) or not (locations or errors):
+        return jsonify({"status": "error", "message": "expected a non-empty 'locations' object or list"}), 400
+
+    for name, entry in locations.items():
+        try:
+            if not name:
+                raise ValueError("missing name")
+            accepted[str(name)] = parse_location(entry)
+        except (KeyError, TypeError, ValueError) as e:
+            errors[str(name)] = str(e) or "invalid location"
+
+    if accepted:
+        store.merge("devices", accepted)
+    logger.debug("[Batch Saved] %d accepted, %d rejected", len(accepted), len(errors))
+    status = 200 if accepted else 400
+    return jsonify({"status": "success" if accepted else "error",
+                    "accepted": len(accepted), "errors": errors}), status
+
 @app.route("/location/default")
 def get_current_location():
-    try:
-        with open(LOCATION_FILE, "r") as f:
-            data = json.load(f)
-        return jsonify(data.get("selected", {}))
-    except:
-        return jsonify(get_default_location()["selected"])
+    return json_with_etag("selected", get_default_location()["selected"])
 
 @app.route("/location/presets")
 def get_presets():
+    return json_with_etag("presets", get_default_location()["presets"])
+
+@app.route("/location/devices")
+def get_devices():
+    return json_with_etag("devices", {})
+
+def serve_production(host, port, threads):
+    # waitress is a multi-threaded production WSGI server; fall back to werkzeug's threaded mode
     try:
-        with open(LOCATION_FILE, "r") as f:
-            data = json.load(f)
-        return jsonify(data.get("presets", {}))
-    except:
-        return jsonify(get_default_location()["presets"])
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed, using the threaded development server")
+        app.run(host=host, port=port, threaded=True)
+        return
+    logger.info("Serving on %s:%d with %d threads", host, port, threads)
+    serve(app, host=host, port=port, threads=threads, connection_limit=4096, backlog=2048)
 
 if __name__ == "__main__":
-    app.run(port=5000)
+    parser = argparse.ArgumentParser(description="EMCS location server")
+    parser.add_argument("--production", action="store_true", help="serve with a multi-threaded WSGI server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--verbose", action="store_true", help="log every saved location")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if args.production:
+        serve_production(args.host, args.port, args.threads)
+    else:
+        app.run(host=args.host, port=args.port)
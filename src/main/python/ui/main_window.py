@@ -1,69 +1,55 @@
 import sys
 import os
-import json
 import webbrowser
-import requests
 
 from PyQt5.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QPushButton, QLabel,
     QHBoxLayout, QStackedWidget, QSizePolicy,
     QGraphicsDropShadowEffect
 )
-from PyQt5.QtCore import Qt, QSize
-from PyQt5.QtGui import QIcon, QFont, QColor
+from PyQt5.QtCore import Qt, QSize, QTimer
+from PyQt5.QtGui import QFont, QColor
 
+from ui.services import http_client, quota
+from ui.services.location_service import LocationService
+from ui.services.refresh_scheduler import RefreshScheduler
+from ui.services.startup import cached_icon
 from ui.welcome_page import IntroWidget
 from ui.modules.air_quality.air_gui import AirQualityWidget
 from ui.modules.water_quality.water_gui import WaterQualityWidget
 from ui.modules.weather_forecast.weather_gui import WeatherForecastWidget
+from ui.modules.multi_location.compare_gui import CompareWidget
 
-LOCATION_FILE = "src/main/python/ui/location.json"
 GEOLOCATION_HTML = "src/main/python/ui/geolocation.html"
+WARM_UP_DELAY_MS = 500   # pause between building hidden pages after first paint
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, warm_up_pages=True):
         super().__init__()
 
         self.setWindowTitle("Environmental Monitoring and Control System")
         self.resize(1400, 800)
-        self.setWindowIcon(QIcon("src/main/python/ui/resources/icons/EMCS_icons.png"))
+        self.setWindowIcon(cached_icon("src/main/python/ui/resources/icons/EMCS_icons.png"))
 
         self.sidebar_expanded = True
         self.current_theme = "light"
         self.current_language = "English"
+        self.warm_up_pages = warm_up_pages
+        self._warm_up_started = False
+        self._released = False
 
         self.init_ui()
         self.try_auto_fetch_location()
 
     def try_auto_fetch_location(self):
-        try:
-            # If location already exists, do nothing
-            if os.path.exists(LOCATION_FILE):
-                with open(LOCATION_FILE, "r") as f:
-                    current = json.load(f).get("current", {})
-                    if current.get("lat") and current.get("lon"):
-                        return  # Already set
-
-            # Try IP-based location
-            response = requests.get("https://ipinfo.io/json")
-            if response.status_code == 200:
-                data = response.json()
-                lat, lon = data.get("loc", "22.5726,88.3639").split(",")
-                city = data.get("city", "Kolkata")
-                with open(LOCATION_FILE, "r") as f:
-                    loc_data = json.load(f)
-                loc_data["current"] = {
-                    "city": city,
-                    "lat": lat,
-                    "lon": lon,
-                    "source": "system-ip"
-                }
-                with open(LOCATION_FILE, "w") as f:
-                    json.dump(loc_data, f, indent=4)
-                print(f"[Auto IP Location] {city}: {lat}, {lon}")
-                return
-        except Exception as e:
-            print("[Auto Location IP Error]", e)
+        # One shared lookup for every page; skipped while the stored location is fresh
+        service = LocationService.instance()
+        service.resolve_failed.connect(self.open_geolocation_page)
+        service.resolve()
+
+    def open_geolocation_page(self, message):
+        if LocationService.instance().location:
+            return  # keep using the stored location
 
         # Fallback to browser location
         try:
@@ -72,7 +58,45 @@ class MainWindow(QMainWindow):
         except Exception as e:
             print("[Open Geolocation HTML Error]", e)
 
+    def create_placeholder(self, title):
+        placeholder = QLabel(f"Loading {title}...")
+        placeholder.setAlignment(Qt.AlignCenter)
+        placeholder.setStyleSheet("background-color: #f5f5f5; color: #6b7280; font-size: 16px;")
+        return placeholder
+
+    def ensure_page(self, title):
+        # Build the page the first time it is needed and swap it in for its placeholder
+        if title in self.pages:
+            return self.pages[title]
+        index = list(self.page_factories).index(title)
+        placeholder = self.stack.widget(index)
+        was_current = self.stack.currentIndex() == index
+        page = self.page_factories[title]()
+        self.stack.removeWidget(placeholder)
+        placeholder.deleteLater()
+        self.stack.insertWidget(index, page)
+        if was_current:
+            self.stack.setCurrentIndex(index)
+        self.pages[title] = page
+        return page
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.warm_up_pages and not self._warm_up_started:
+            self._warm_up_started = True
+            # Let the first frame paint before building the hidden pages
+            QTimer.singleShot(WARM_UP_DELAY_MS, self.warm_up_next_page)
+
+    def warm_up_next_page(self):
+        # One page per event-loop turn so the UI stays responsive in between
+        pending = [t for t in self.page_factories if t not in self.pages]
+        if pending:
+            self.ensure_page(pending[0])
+            if len(pending) > 1:
+                QTimer.singleShot(WARM_UP_DELAY_MS, self.warm_up_next_page)
+
     def set_active_page(self, index, title):
+        self.ensure_page(title)
         self.stack.setCurrentIndex(index)
         self.buttons[title].setChecked(True)
 
@@ -121,29 +145,32 @@ class MainWindow(QMainWindow):
         self.toggle_btn.setStyleSheet("color: black; background-color: transparent;")
         self.sidebar_layout.addWidget(self.toggle_btn)
 
-        # Sidebar Pages
-        self.pages = {
-            "Home": IntroWidget(),  # welcome page
-            "Air Quality": AirQualityWidget(),
-            "Water Quality": WaterQualityWidget(),
-            "Weather Forecast": WeatherForecastWidget()
+        # Sidebar Pages: only Home is built up front, the rest on first use
+        self.page_factories = {
+            "Home": IntroWidget,  # welcome page
+            "Air Quality": AirQualityWidget,
+            "Water Quality": WaterQualityWidget,
+            "Weather Forecast": WeatherForecastWidget,
+            "Compare Locations": CompareWidget
         }
+        self.pages = {}
 
         self.stack = QStackedWidget()
-        for page in self.pages.values():
-            # page.setAlignment(Qt.AlignCenter)
-            self.stack.addWidget(page)
+        for title in self.page_factories:
+            self.stack.addWidget(self.create_placeholder(title))
+        self.ensure_page("Home")
 
         self.buttons = {}
-        for i, title in enumerate(self.pages.keys()): 
+        for i, title in enumerate(self.page_factories.keys()):
             icon_paths = {
                 "Home": "src/main/python/ui/resources/icons/home-icon.png",
                 "Air Quality": "src/main/python/ui/resources/icons/air_quality.png",
                 "Water Quality": "src/main/python/ui/resources/icons/water_quality.png",
-                "Weather Forecast": "src/main/python/ui/resources/icons/weather_forecast.png"
+                "Weather Forecast": "src/main/python/ui/resources/icons/weather_forecast.png",
+                "Compare Locations": "src/main/python/ui/resources/icons/EMCS_icons.png"
             }
             btn = QPushButton(title)
-            btn.setIcon(QIcon(icon_paths[title]))
+            btn.setIcon(cached_icon(icon_paths[title]))
             btn.setIconSize(QSize(48, 48))  # Adjust icon size as needed
             btn.setCheckable(True)
             btn.setAutoExclusive(True)
@@ -173,7 +200,7 @@ class MainWindow(QMainWindow):
 
         # Exit Button
         exit_btn = QPushButton("  Exit")
-        exit_btn.setIcon(QIcon("src/main/python/ui/resources/icons/exit_button.png"))
+        exit_btn.setIcon(cached_icon("src/main/python/ui/resources/icons/exit_button.png"))
         exit_btn.setIconSize(QSize(42, 42))
         exit_btn.setToolTip("Close the application")
         exit_btn.setStyleSheet("""
@@ -228,7 +255,24 @@ class MainWindow(QMainWindow):
         #self.current_language = language
         #(Optional) Update UI translation logic here
 
+    def closeEvent(self, event):
+        self.release_resources()
+        super().closeEvent(event)
+
+    def release_resources(self):
+        # Runs once, whether the app exits through the Exit button or the window's close button
+        if self._released:
+            return
+        self._released = True
+        print("[Quota]", quota.manager.summary())
+        RefreshScheduler.instance().stop()
+        for page in self.pages.values():
+            if hasattr(page, "shutdown"):
+                page.shutdown()
+        http_client.close()
+
     def close_app(self):
         print("[Exit] Closing app and cleaning up...")
+        self.release_resources()
         self.close()
         sys.exit(0)
@@ -1,25 +1,41 @@
-import os
-import json
-import geocoder
-import requests
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QFrame,
-    QGridLayout, QSpacerItem, QSizePolicy, QCompleter
+    QGridLayout, QSpacerItem, QSizePolicy
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 
+from ui.services import openweather, quota
+from ui.services.alert_rules import RuleEngine, load_rules
+from ui.services.city_index import get_city_index
+from ui.services.fetch_engine import FetchEngine
+from ui.services.location_service import LocationService
+from ui.services.quota_interceptor import TileQuotaInterceptor
+from ui.services.refresh_scheduler import RefreshScheduler
+
+REFRESH_SECONDS = 15 * 60   # OpenWeather updates air pollution data about hourly
+AIR_METRICS = ("co", "no", "no2", "o3", "so2", "nh3", "pm2_5", "pm10")
+ALERT_CARD_STYLE = "color: #dc2626;"
+
 class AirQualityWidget(QWidget):
     def __init__(self):
         super().__init__()
 
         self.lat = None
         self.lon = None
+        self.location_searched = False
+        self.alerts = RuleEngine(load_rules(), AIR_METRICS)  # threshold rules over `components`
+        self.alert_location = None
 
         self.setStyleSheet("background-color: #f9fafb; color: #111827;")
         
-        self.api_key = "your api key"  # Replace with your actual OpenWeather API key
+        self.api_key = openweather.API_KEY  # set your OpenWeather API key in ui/services/openweather.py
+
+        self.fetch_engine = FetchEngine(self)
+        self.fetch_engine.result_ready.connect(self.on_fetch_result)
+        self.fetch_engine.request_failed.connect(self.on_fetch_failed)
+        self.fetch_engine.batch_finished.connect(self.on_fetch_finished)
 
         self.init_ui()
 
@@ -27,6 +43,11 @@ class AirQualityWidget(QWidget):
         self.setup_autocomplete()
         self.fetch_air_quality_data()
 
+        # Periodic refresh while the page is on screen
+        RefreshScheduler.instance().register(
+            "air", lambda: self.fetch_air_quality_data(quota.BACKGROUND), REFRESH_SECONDS,
+            widget=self, reports=True)
+
     def init_ui(self):
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setSpacing(10)
@@ -69,7 +90,12 @@ class AirQualityWidget(QWidget):
         self.label_temp.setFont(QFont("Arial", 10))
         self.label_temp.setAlignment(Qt.AlignRight)
 
+        self.label_alerts = QLabel("")
+        self.label_alerts.setFont(QFont("Arial", 10, QFont.Bold))
+        self.label_alerts.setStyleSheet(ALERT_CARD_STYLE)
+
         summary_layout.addWidget(self.label_location, alignment=Qt.AlignLeft)
+        summary_layout.addWidget(self.label_alerts, alignment=Qt.AlignCenter)
         summary_layout.addWidget(self.label_temp, alignment=Qt.AlignRight)
         self.main_layout.addWidget(self.summary_bar)
 
@@ -116,60 +142,43 @@ class AirQualityWidget(QWidget):
 
         # 🗺️ 4. Map Section
         self.map = QWebEngineView()
+        # Map tiles use the same API key, so they draw from the shared quota too
+        self.tile_interceptor = TileQuotaInterceptor(self.map)
+        self.tile_interceptor.install(self.map.page().profile())
         self.map.setMinimumHeight(300)
         self.map.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.main_layout.addWidget(self.map)
 
     def setup_autocomplete(self):
         try:
-            path = os.path.abspath("src/main/python/ui/location.json")
-            with open(path, "r") as f:
-                data = json.load(f)
-            suggestions = list(data.get("cities", {}).keys())
-            completer = QCompleter(suggestions)
-            completer.setCaseSensitivity(Qt.CaseInsensitive)
-            self.location_input.setCompleter(completer)
+            # Shared, sorted city model; parsed once for all pages
+            self.location_input.setCompleter(get_city_index().completer(self))
         except Exception as e:
             DEBUG = False
             if DEBUG:
                 print("[Autocomplete Setup Error]:", e)
 
     def load_location(self):
-        # 🔄 Load location from device (fallback handled)
-        try:
-            g = geocoder.ip('me')
-            if g.ok and g.latlng:
-                self.lat, self.lon = map(str, g.latlng)
-
-                DEBUG = False
-                if DEBUG: 
-                    print(f"[Auto Location] IP-based location detected: {self.lat}, {self.lon}")
-            else:
-                DEBUG = False
-                if DEBUG:
-                    raise ValueError("IP Geolocation failed, falling back to Kolkata.")
-        except:
-            DEBUG = False
-            if DEBUG:
-                print("[Fallback] IP Geolocation error:", e)
-            return 22.57, 88.36
-            DEBUG = False
-            if DEBUG:
-                print("[Fallback] Using Kolkata as default location.")
+        # Stored location right away; the shared service pushes the IP-based one when it resolves
+        service = LocationService.instance()
+        self.lat, self.lon, _ = service.current()
+        service.location_changed.connect(self.on_location_changed)
+
+    def on_location_changed(self, lat, lon, city):
+        if self.location_searched:
+            return  # keep the city the user picked
+        self.lat, self.lon = lat, lon
+        self.fetch_air_quality_data()
 
     def handle_location_search(self):
         query = self.location_input.text().strip().lower()
         try:
-            path = os.path.abspath("src/main/python/ui/location.json")
-            with open(path, "r") as f:
-                data = json.load(f)
-
-            # Make cities lookup case-insensitive
-            normalized_cities = {k.lower(): v for k, v in data.get("cities", {}).items()}
-            
-            if query in normalized_cities:
-                city = normalized_cities[query]
+            # Case-insensitive exact match, falling back to the closest spelling
+            city = get_city_index().lookup(query)
+
+            if city:
                 self.lat, self.lon = city["lat"], city["lon"]
+                self.location_searched = True
 
                 DEBUG = False
                 if DEBUG:
@@ -205,11 +214,28 @@ class AirQualityWidget(QWidget):
             if DEBUG:
                 print("[Air Quality Search] Failed to load location:", e)
 
-    def fetch_air_quality_data(self):
-        url = f"http://api.openweathermap.org/data/2.5/air_pollution?lat={self.lat}&lon={self.lon}&appid={self.api_key}"
+    def fetch_air_quality_data(self, priority=quota.URGENT):
+        # Both requests run concurrently off the GUI thread; a new search supersedes them
+        air_url = openweather.air_pollution_url(self.lat, self.lon, self.api_key)
+        weather_url = openweather.current_weather_url(self.lat, self.lon, self.api_key)
+        self.fetch_engine.submit({"air": air_url, "weather": weather_url}, priority)
+
+    def on_fetch_result(self, tag, data):
+        if tag == "air":
+            self.update_air_quality(data)
+        elif tag == "weather":
+            self.update_weather_info(data)
+
+    def on_fetch_finished(self, results, errors):
+        RefreshScheduler.instance().done("air", ok=not errors)
+
+    def on_fetch_failed(self, tag, message):
+        DEBUG = False
+        if DEBUG:
+            print(f"[API Fetch Error] {tag}:", message)
+
+    def update_air_quality(self, data):
         try:
-            res = requests.get(url)
-            data = res.json()
             DEBUG = False
             if DEBUG:
                 print("[API Response]", data)
@@ -224,9 +250,9 @@ class AirQualityWidget(QWidget):
                     else:
                         val = components.get(key, "--")
                         self.card_widgets[key].setText(f"{val:.2f}" if isinstance(val, float) else str(val))
+                self.check_alerts(components)
 
             # Load map layer after data is fetched
-            self.fetch_weather_info()  # fetch current location info
             self.load_map()
 
         except Exception as e:
@@ -234,11 +260,21 @@ class AirQualityWidget(QWidget):
             if DEBUG:
                 print("[API Fetch Error]:", e)
 
-    def fetch_weather_info(self):
-        url = f"https://api.openweathermap.org/data/2.5/weather?lat={self.lat}&lon={self.lon}&appid={self.api_key}&units=metric"
+    def check_alerts(self, components):
+        # Hysteresis state belongs to one place; start over when the location changes
+        if self.alert_location != (self.lat, self.lon):
+            self.alerts.reset()
+            self.alert_location = (self.lat, self.lon)
+        self.alerts.evaluate_one(components)
+
+        active = self.alerts.active_rules()
+        breached = {rule["metric"] for rule in active}
+        for key, label in self.card_widgets.items():
+            label.setStyleSheet(ALERT_CARD_STYLE if key in breached else "")
+        self.label_alerts.setText("  ".join(f"⚠ {rule.get('message', rule['id'])}" for rule in active))
+
+    def update_weather_info(self, data):
         try:
-            res = requests.get(url)
-            data = res.json()
             DEBUG = False
             if DEBUG:
                 print("[Weather API]", data)
@@ -0,0 +1,250 @@
+import time
+
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+    QTableWidget, QTableWidgetItem, QHeaderView, QAbstractItemView
+)
+from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import Qt
+
+from ui.location_presets import DEFAULT_SELECTED, PRESETS
+from ui.services import openweather, quota
+from ui.services.alert_rules import RuleEngine, load_rules
+from ui.services.city_index import get_city_index
+from ui.services.fetch_engine import FetchEngine
+from ui.services.refresh_scheduler import RefreshScheduler
+from ui.modules.air_quality.air_gui import AIR_METRICS
+
+# Air pollution and current weather for many places at once. Every location
+# needs two requests; they all go to one FetchEngine that keeps at most
+# MAX_IN_FLIGHT of them on the shared I/O pool, so a refresh takes about
+# ceil(2 * locations / MAX_IN_FLIGHT) round trips and leaves threads free
+# for the other pages.
+
+MAX_IN_FLIGHT = 8
+REFRESH_SECONDS = 15 * 60
+
+# (header, key); air keys come from "components", weather keys from the current weather
+COLUMNS = [
+    ("Location", "name"),
+    ("AQI", "aqi"),
+    ("PM2.5", "pm2_5"),
+    ("PM10", "pm10"),
+    ("NO2", "no2"),
+    ("O3", "o3"),
+    ("SO2", "so2"),
+    ("Temp °C", "temp"),
+    ("Humidity %", "humidity"),
+    ("Wind m/s", "wind"),
+    ("Sky", "sky"),
+    ("Updated", "updated"),
+]
+COLUMN_OF = {key: i for i, (_, key) in enumerate(COLUMNS)}
+
+# OpenWeather AQI scale 1 (Good) .. 5 (Very Poor)
+AQI_COLORS = {1: "#bbf7d0", 2: "#d9f99d", 3: "#fef08a", 4: "#fed7aa", 5: "#fecaca"}
+BREACH_COLOR = QColor("#dc2626")
+
+
+class CompareWidget(QWidget):
+    def __init__(self):
+        super().__init__()
+
+        self.setStyleSheet("background-color: #f9fafb; color: #111827;")
+        self.api_key = openweather.API_KEY
+
+        self.locations = {}        # name -> (lat, lon)
+        self.items = {}            # name -> row items, indexed like COLUMNS
+        self.station_ids = {}      # name -> alert engine station id
+        self.next_station = 0
+        self.alerts = RuleEngine(load_rules(), AIR_METRICS)
+        self.refresh_started = None
+
+        self.fetch_engine = FetchEngine(self, max_in_flight=MAX_IN_FLIGHT)
+        self.fetch_engine.result_ready.connect(self.on_fetch_result)
+        self.fetch_engine.batch_finished.connect(self.on_fetch_finished)
+
+        self.init_ui()
+        # The location server's default selection and presets
+        self.add_location(DEFAULT_SELECTED["name"].split(",")[0], DEFAULT_SELECTED["lat"], DEFAULT_SELECTED["lon"])
+        for name, preset in PRESETS.items():
+            self.add_location(name, preset["lat"], preset["lon"])
+
+        # Refreshes run only while the page is on screen; nothing is fetched until it is first shown
+        RefreshScheduler.instance().register(
+            "compare", lambda: self.refresh_all(quota.BACKGROUND), REFRESH_SECONDS,
+            widget=self, run_when_shown=True, reports=True)
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(20, 20, 20, 20)
+        layout.setSpacing(12)
+
+        title = QLabel("Compare Locations")
+        title.setFont(QFont("Arial", 18, QFont.Bold))
+        layout.addWidget(title)
+
+        controls = QHBoxLayout()
+        self.location_input = QLineEdit()
+        self.location_input.setPlaceholderText("Add a city...")
+        self.location_input.setStyleSheet("""
+            QLineEdit {
+                border: 2px solid #d1d5db;
+                border-radius: 20px;
+                padding: 8px 16px;
+                font-size: 14px;
+                background-color: white;
+            }
+        """)
+        self.location_input.returnPressed.connect(self.handle_add_location)
+        try:
+            self.location_input.setCompleter(get_city_index().completer(self))
+        except Exception as e:
+            print("[Compare] City list not loaded:", e)
+        controls.addWidget(self.location_input, 1)
+
+        for text, slot in (("Add", self.handle_add_location),
+                           ("Remove selected", self.remove_selected),
+                           ("Refresh", lambda: self.refresh_all(quota.URGENT))):
+            button = QPushButton(text)
+            button.setStyleSheet("padding: 8px 14px; border-radius: 8px; background-color: #e0f2fe;")
+            button.clicked.connect(slot)
+            controls.addWidget(button)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels([header for header, _ in COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(28)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSortingEnabled(True)
+        self.table.setStyleSheet("background-color: white; font-size: 13px;")
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel("")
+        self.status_label.setStyleSheet("color: #6b7280;")
+        layout.addWidget(self.status_label)
+
+    def handle_add_location(self):
+        query = self.location_input.text().strip()
+        city = get_city_index().lookup(query) if query else None
+        if not city:
+            self.status_label.setText(f"❌ Unknown city: {query}")
+            return
+        name = city["name"].title()
+        if self.add_location(name, city["lat"], city["lon"]):
+            self.location_input.clear()
+            self.fetch_locations([name], quota.URGENT)
+
+    def add_location(self, name, lat, lon):
+        if name in self.locations:
+            return False
+        self.locations[name] = (lat, lon)
+        if name not in self.station_ids:
+            self.station_ids[name] = self.next_station
+            self.next_station += 1
+
+        # Sorting would move the new row while it is filled in
+        self.table.setSortingEnabled(False)
+        row = self.table.rowCount()
+        self.table.insertRow(row)
+        items = []
+        for column in range(len(COLUMNS)):
+            item = QTableWidgetItem("--")
+            if column:
+                item.setTextAlignment(Qt.AlignCenter)
+            self.table.setItem(row, column, item)
+            items.append(item)
+        items[0].setText(name)
+        self.items[name] = items
+        self.table.setSortingEnabled(True)
+        return True
+
+    def remove_selected(self):
+        rows = sorted({index.row() for index in self.table.selectedIndexes()}, reverse=True)
+        for row in rows:
+            name = self.table.item(row, 0).text()
+            self.locations.pop(name, None)
+            self.items.pop(name, None)
+            self.station_ids.pop(name, None)
+            self.table.removeRow(row)
+
+    def refresh_all(self, priority=quota.URGENT):
+        if not self.locations:
+            RefreshScheduler.instance().done("compare")
+            return
+        self.fetch_locations(list(self.locations), priority)
+
+    def fetch_locations(self, names, priority):
+        # A new submit supersedes the previous batch, so include everything not yet loaded
+        if self.fetch_engine.is_busy():
+            names = list(self.locations)
+        urls = {}
+        for name in names:
+            lat, lon = self.locations[name]
+            urls[f"air|{name}"] = openweather.air_pollution_url(lat, lon, self.api_key)
+            urls[f"weather|{name}"] = openweather.current_weather_url(lat, lon, self.api_key)
+        self.refresh_started = time.monotonic()
+        self.status_label.setText(f"Refreshing {len(names)} locations...")
+        self.fetch_engine.submit(urls, priority)
+
+    def on_fetch_result(self, tag, data):
+        kind, name = tag.split("|", 1)
+        items = self.items.get(name)
+        if items is None:
+            return  # removed while the request was running
+        # Keep rows still while their values change
+        self.table.setSortingEnabled(False)
+        try:
+            if kind == "air":
+                self.update_air(name, items, data)
+            else:
+                self.update_weather(items, data)
+            self.set_value(items, "updated", time.strftime("%H:%M"))
+        except (KeyError, IndexError, TypeError) as e:
+            DEBUG = False
+            if DEBUG:
+                print(f"[Compare] {tag}:", e)
+        self.table.setSortingEnabled(True)
+
+    def set_value(self, items, key, value):
+        item = items[COLUMN_OF[key]]
+        if isinstance(value, float):
+            value = round(value, 2)
+        # Numbers go in as data so columns sort numerically
+        if item.data(Qt.DisplayRole) != value:
+            item.setData(Qt.DisplayRole, value)
+
+    def update_air(self, name, items, data):
+        entry = data["list"][0]
+        components = entry["components"]
+        aqi = entry["main"]["aqi"]
+        self.set_value(items, "aqi", aqi)
+        items[COLUMN_OF["aqi"]].setBackground(QColor(AQI_COLORS.get(aqi, "#ffffff")))
+        for key in ("pm2_5", "pm10", "no2", "o3", "so2"):
+            self.set_value(items, key, components.get(key, "--"))
+
+        self.alerts.evaluate_one(components, station=self.station_ids[name])
+        breached = {rule["metric"] for rule in self.alerts.active_rules(self.station_ids[name])}
+        for key in ("pm2_5", "pm10", "no2", "o3", "so2"):
+            item = items[COLUMN_OF[key]]
+            item.setForeground(BREACH_COLOR if key in breached else QColor("#111827"))
+
+    def update_weather(self, items, data):
+        self.set_value(items, "temp", data["main"]["temp"])
+        self.set_value(items, "humidity", data["main"]["humidity"])
+        self.set_value(items, "wind", data["wind"]["speed"])
+        self.set_value(items, "sky", data["weather"][0]["main"])
+
+    def on_fetch_finished(self, results, errors):
+        RefreshScheduler.instance().done("compare", ok=len(errors) < len(results) + len(errors))
+        elapsed = time.monotonic() - (self.refresh_started or time.monotonic())
+        text = (f"Updated {len(results)} of {len(results) + len(errors)} requests in {elapsed:.1f}s "
+                f"(up to {MAX_IN_FLIGHT} at a time)")
+        if errors:
+            text += f" · {len(errors)} failed"
+        self.status_label.setText(text)
@@ -0,0 +1,208 @@
+import numpy as np
+
+from ui.modules.water_quality.ring_buffer import RingBuffer
+
+# Multi-resolution views of a time series for the water charts.
+#
+# Above the raw readings sit LEVELS tiers per mode, each FACTOR times coarser
+# than the one below and fed only by the points the tier below emits, so every
+# reading is bucketed once per tier as it arrives. Every tier keeps the same
+# number of points, so each one reaches FACTOR times further back in time.
+# A chart asks for a time range and a point budget and gets the finest tier
+# that fits; when that tier has already dropped the range, the series reads
+# it from its archive (the on-disk history) instead.
+#
+#   LTTB     one point per bucket: the largest triangle between the previous
+#            bucket's mean and the next bucket's mean. Fixing both vertices
+#            (instead of the previously selected point) makes every bucket
+#            independent, so a whole batch is one NumPy expression.
+#   Min/Max  the minimum and maximum of every bucket, in time order; spikes
+#            survive at every zoom level.
+
+FACTOR = 8
+LEVELS = 4
+LEVEL_CAPACITY = 50_000     # points kept by every tier
+MODES = ("LTTB", "Min/Max")
+
+
+def _nan_mean(rows):
+    present = ~np.isnan(rows)
+    count = present.sum(axis=1)
+    total = np.where(present, rows, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan)
+
+
+def _largest_triangles(x, y, ax, ay, cx, cy):
+    """x, y: (buckets, size); a, c: (buckets,) fixed vertices on either side.
+    Column of the point spanning the largest triangle in every bucket."""
+    area = np.abs((ax - cx)[:, None] * (y - ay[:, None]) - (ax[:, None] - x) * (cy - ay)[:, None])
+    return np.where(np.isnan(area), -1.0, area).argmax(axis=1)
+
+
+def _extremes(y):
+    """Columns of the minimum and maximum of every row, in time order."""
+    low = np.where(np.isnan(y), np.inf, y).argmin(axis=1)
+    high = np.where(np.isnan(y), -np.inf, y).argmax(axis=1)
+    return np.sort(np.stack([low, high], axis=1), axis=1)
+
+
+def _take(rows, cols):
+    return rows[np.arange(len(rows))[:, None], cols.reshape(len(rows), -1)].ravel()
+
+
+def lttb(x, y, max_points):
+    """Indices of at most max_points points of (x, y), first and last always kept."""
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    size = -(-(n - 2) // (max_points - 2))
+    buckets = -(-(n - 2) // size)
+    pad = buckets * size - (n - 2)
+    bx = np.concatenate([x[1:-1], np.full(pad, np.nan)]).reshape(buckets, size)
+    by = np.concatenate([y[1:-1].astype(np.float64), np.full(pad, np.nan)]).reshape(buckets, size)
+    mx, my = _nan_mean(bx), _nan_mean(by)
+    ax, ay = np.concatenate([[x[0]], mx[:-1]]), np.concatenate([[y[0]], my[:-1]])
+    cx, cy = np.concatenate([mx[1:], [x[-1]]]), np.concatenate([my[1:], [y[-1]]])
+    picked = 1 + np.arange(buckets) * size + _largest_triangles(bx, by, ax, ay, cx, cy)
+    return np.concatenate([[0], np.minimum(picked, n - 2), [n - 1]])
+
+
+def minmax(x, y, max_points):
+    """Indices of the per-bucket minimum and maximum, at most about max_points of them."""
+    n = len(x)
+    if n <= max_points or max_points < 2:
+        return np.arange(n)
+    size = -(-n // (max_points // 2))
+    buckets = n // size
+    cols = _extremes(np.asarray(y[:buckets * size], dtype=np.float64).reshape(buckets, size))
+    picked = (np.arange(buckets)[:, None] * size + cols).ravel()
+    return np.concatenate([picked, np.arange(buckets * size, n)])
+
+
+class _Tier:
+    """One resolution level: bucketed output in ring buffers plus not-yet-bucketed input."""
+
+    def __init__(self, mode, capacity):
+        self.mode = mode
+        self.size = FACTOR if mode == "LTTB" else 2 * FACTOR   # both modes thin by FACTOR
+        self.ts = RingBuffer(capacity, np.float64)
+        self.values = RingBuffer(capacity, np.float32)
+        self.pending_ts = np.empty(0, dtype=np.float64)
+        self.pending_values = np.empty(0, dtype=np.float32)
+        self.anchor = None     # mean of the last LTTB bucket emitted
+        self.evicted = False
+
+    def feed(self, ts, values):
+        """Bucket new input; returns the points this tier emitted."""
+        ts = np.concatenate([self.pending_ts, ts])
+        values = np.concatenate([self.pending_values, np.asarray(values, dtype=np.float32)])
+        full = len(ts) // self.size
+        # LTTB needs the mean of the following bucket, so it holds the newest full bucket back
+        ready = full - 1 if self.mode == "LTTB" else full
+        if ready <= 0:
+            self.pending_ts, self.pending_values = ts, values
+            return self.pending_ts[:0], self.pending_values[:0]
+
+        bx = ts[:(ready + 1 if self.mode == "LTTB" else ready) * self.size].reshape(-1, self.size)
+        by = values[:len(bx) * self.size].reshape(-1, self.size).astype(np.float64)
+        if self.mode == "LTTB":
+            mx, my = bx.mean(axis=1), _nan_mean(by)
+            ax, ay = self.anchor if self.anchor is not None else (mx[0], my[0])
+            cols = _largest_triangles(bx[:ready], by[:ready],
+                                      np.concatenate([[ax], mx[:ready - 1]]), np.concatenate([[ay], my[:ready - 1]]),
+                                      mx[1:], my[1:])
+            self.anchor = (mx[ready - 1], my[ready - 1])
+        else:
+            cols = _extremes(by)
+        out_ts = _take(bx[:ready], cols)
+        out_values = _take(by[:ready], cols).astype(np.float32)
+
+        self.pending_ts = ts[ready * self.size:]
+        self.pending_values = values[ready * self.size:]
+        self.evicted = self.evicted or len(self.ts) + len(out_ts) > self.ts.capacity
+        self.ts.extend(out_ts)
+        self.values.extend(out_values)
+        return out_ts, out_values
+
+    def clear(self):
+        self.ts.clear()
+        self.values.clear()
+        self.pending_ts = self.pending_ts[:0]
+        self.pending_values = self.pending_values[:0]
+        self.anchor = None
+        self.evicted = False
+
+
+class DownsampledSeries:
+    """LTTB and min/max tiers over a raw series held in the caller's ring buffers.
+
+    The caller appends to raw_ts/raw_values itself and then passes the same
+    readings to extend(), which cascades them up the tiers. archive, if
+    given, is called as archive(start, end, max_points) -> (ts, values) or
+    None for ranges the fitting tier no longer holds.
+    """
+
+    def __init__(self, raw_ts, raw_values, levels=LEVELS, capacity=LEVEL_CAPACITY, archive=None):
+        self.raw_ts = raw_ts
+        self.raw_values = raw_values
+        self.archive = archive
+        self.tiers = {mode: [_Tier(mode, capacity) for _ in range(levels)] for mode in MODES}
+
+    def extend(self, timestamps, values):
+        for tiers in self.tiers.values():
+            ts, vals = timestamps, values
+            for tier in tiers:
+                ts, vals = tier.feed(ts, vals)
+                if not len(ts):
+                    break
+
+    def clear(self):
+        for tiers in self.tiers.values():
+            for tier in tiers:
+                tier.clear()
+
+    def _level(self, level, mode):
+        """(ts, values, complete) of a level; complete means nothing was evicted yet."""
+        if level == 0:
+            return self.raw_ts.last(), self.raw_values.last(), len(self.raw_ts) < self.raw_ts.capacity
+        tier = self.tiers[mode][level - 1]
+        return tier.ts.last(), tier.values.last(), not tier.evicted
+
+    def _tail(self, level, mode):
+        # Readings newer than the level's last point, still waiting in the tiers below it
+        tiers = self.tiers[mode][:level][::-1]
+        return (np.concatenate([t.pending_ts for t in tiers]),
+                np.concatenate([t.pending_values for t in tiers]))
+
+    def view(self, start, end, max_points, mode="LTTB"):
+        """Points covering [start, end] from the finest level that fits in max_points."""
+        top = len(self.tiers[mode])
+        for level in range(top + 1):
+            ts, values, complete = self._level(level, mode)
+            covers = complete or (len(ts) and ts[0] <= start)
+            lo = int(np.searchsorted(ts, start, side="left"))
+            hi = int(np.searchsorted(ts, end, side="right"))
+            fits = hi - lo <= max_points
+            archived = None
+            if fits and not covers and self.archive is not None:
+                # Zoomed into a stretch only coarser tiers still hold
+                archived = self.archive(start, end, max_points)
+            if archived is None and level < top and not (covers and fits):
+                continue
+
+            if archived is not None:
+                x, y = archived
+            else:
+                # One point beyond each edge keeps the line running off the plot
+                lo, hi = max(lo - 1, 0), min(hi + 1, len(ts))
+                x, y = ts[lo:hi], values[lo:hi]
+                if level and hi == len(ts):
+                    tail_ts, tail_values = self._tail(level, mode)
+                    keep = tail_ts <= end
+                    x = np.concatenate([x, tail_ts[keep]])
+                    y = np.concatenate([y, tail_values[keep]])
+            if len(x) > max_points:
+                idx = (lttb if mode == "LTTB" else minmax)(x, y, max_points)
+                x, y = x[idx], y[idx]
+            return x, y
@@ -0,0 +1,340 @@
+import os
+import tempfile
+import time
+import zlib
+from datetime import datetime, timezone
+
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+
+DATA_DIR = "src/main/python/ui/data/water"
+SEGMENT_SUFFIX = ".wql"
+LATE_SUFFIX = ".late"        # side file of a segment: records older than the segment's tail
+TMP_SUFFIX = ".tmp"
+RETENTION_DAYS = 180
+INDEX_STRIDE = 1024          # one in-memory timestamp per this many records
+MAX_LATE_RECORDS = 1 << 20   # late records kept on the side before they are folded into the segment
+MAX_LATE_RUNS = 64           # sorted runs of late records merged into one past this
+COPY_RECORDS = 1 << 20       # records copied at a time when a segment is rewritten
+SECONDS_PER_DAY = 86400
+
+# Fixed-width little-endian record; crc covers every byte before it
+RECORD_DTYPE = np.dtype([
+    ("ts", "<f8"),
+    ("station", "<u4"),
+    ("values", "<f4", (len(PARAMETER_KEYS),)),
+    ("crc", "<u4"),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+PAYLOAD_SIZE = RECORD_SIZE - 4
+
+
+def day_of(ts):
+    return int(ts // SECONDS_PER_DAY)
+
+
+def segment_name(day):
+    date = datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc)
+    return date.strftime("%Y%m%d") + SEGMENT_SUFFIX
+
+
+def record_crc(raw):
+    return zlib.crc32(raw[:PAYLOAD_SIZE]) & 0xFFFFFFFF
+
+
+def sort_records(records):
+    return records[np.argsort(records["ts"], kind="stable")]
+
+
+def write_atomic(path, parts):
+    """Replace path with the concatenated record arrays; a crash leaves either file whole."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for part in parts:
+                f.write(part.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class Segment:
+    """One day of records: appended through a file handle, read through a memmap.
+
+    Records older than the end of the file go to an append-only side file
+    and are kept in memory as sorted runs until they are folded in.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.late_path = path + LATE_SUFFIX
+        self.count = os.path.getsize(path) // RECORD_SIZE if os.path.exists(path) else 0
+        self.index = np.empty(0, dtype=np.float64)   # ts of every INDEX_STRIDE-th record
+        self.late_runs = []
+        self._map = None
+        self._map_count = 0
+
+    def late_count(self):
+        return sum(len(run) for run in self.late_runs)
+
+    def add_late(self, records):
+        self.late_runs.append(records)
+        if len(self.late_runs) > MAX_LATE_RUNS:
+            self.late_runs = [sort_records(np.concatenate(self.late_runs))]
+
+    def late_in(self, start, end):
+        parts = []
+        for run in self.late_runs:
+            ts = run["ts"]
+            lo, hi = np.searchsorted(ts, start, side="left"), np.searchsorted(ts, end, side="left")
+            if hi > lo:
+                parts.append(run[lo:hi])
+        return parts
+
+    def records(self):
+        """Memory-mapped view of every complete record (empty array if none)."""
+        if self.count == 0:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        if self._map is None or self._map_count != self.count:
+            self._map = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", shape=(self.count,))
+            self._map_count = self.count
+        return self._map
+
+    def rebuild_index(self):
+        self.index = np.array(self.records()["ts"][::INDEX_STRIDE], dtype=np.float64)
+
+    def extend_index(self, first, ts):
+        # first: record number of ts[0]; keep the entries that land on the stride
+        offset = (-first) % INDEX_STRIDE
+        if offset < len(ts):
+            self.index = np.concatenate([self.index, ts[offset::INDEX_STRIDE]])
+
+    def locate(self, start, end):
+        """Record range [lo, hi) with start <= ts < end, using the sparse index."""
+        if self.count == 0:
+            return 0, 0
+        ts = self.records()["ts"]
+        return self._search(ts, start), self._search(ts, end)
+
+    def _search(self, ts, value):
+        # index[b - 1] < value <= index[b], so the answer lies within one stride
+        b = int(np.searchsorted(self.index, value, side="left"))
+        lo = max(b - 1, 0) * INDEX_STRIDE
+        hi = min(b * INDEX_STRIDE, self.count) if b < len(self.index) else self.count
+        return lo + int(np.searchsorted(ts[lo:hi], value, side="left"))
+
+    def last_ts(self):
+        return float(self.records()["ts"][-1]) if self.count else -np.inf
+
+    def close(self):
+        self._map = None
+
+
+class HistoryLog:
+    """On-disk water history, one append-mostly segment file per UTC day.
+
+    Segment files are append-only and sorted by timestamp; batches are
+    sorted before they are written. Records older than the end of their
+    segment (a station whose clock lags, a source that delivers late) are
+    appended to the segment's side file instead and merged in at query
+    time. When a side file grows past MAX_LATE_RECORDS it is folded into
+    the segment by writing a new file and renaming it over the old one, so
+    a crash at any point leaves either the old or the new segment. Reads go through memory
+    maps, so range queries over months of data only touch the pages they
+    return.
+    """
+
+    def __init__(self, directory=DATA_DIR, retention_days=RETENTION_DAYS):
+        self.directory = directory
+        self.retention_days = retention_days
+        self.segments = {}       # day -> Segment
+        self._active_day = None
+        self._file = None
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+        self.apply_retention()
+
+    def _scan(self):
+        for name in sorted(os.listdir(self.directory)):
+            if name.endswith(TMP_SUFFIX):
+                # A rewrite that never reached its rename
+                os.remove(os.path.join(self.directory, name))
+                continue
+            if not name.endswith(SEGMENT_SUFFIX):
+                continue
+            try:
+                date = datetime.strptime(name[:-len(SEGMENT_SUFFIX)], "%Y%m%d").replace(tzinfo=timezone.utc)
+            except ValueError:
+                continue
+            day = day_of(date.timestamp())
+            path = os.path.join(self.directory, name)
+            self.recover(path)
+            segment = Segment(path)
+            segment.rebuild_index()
+            self._load_late(segment)
+            self.segments[day] = segment
+
+    def _load_late(self, segment):
+        if not os.path.exists(segment.late_path):
+            return
+        self.recover(segment.late_path)
+        late = sort_records(np.fromfile(segment.late_path, dtype=RECORD_DTYPE))
+        if len(late) and segment.count:
+            # A crash between folding the side file in and removing it leaves its records in both
+            records = segment.records()
+            lo, hi = segment.locate(late["ts"][0], np.nextafter(late["ts"][0], np.inf))
+            same = records[lo:hi].view(np.uint8).reshape(-1, RECORD_SIZE) == late[:1].view(np.uint8)
+            if same.all(axis=1).any():
+                os.remove(segment.late_path)
+                return
+        if len(late):
+            segment.late_runs = [late]
+
+    @staticmethod
+    def recover(path):
+        """Drop a torn or corrupt tail left behind by a crash mid-write."""
+        size = os.path.getsize(path)
+        good = size - size % RECORD_SIZE
+        with open(path, "rb") as f:
+            while good >= RECORD_SIZE:
+                f.seek(good - RECORD_SIZE)
+                raw = f.read(RECORD_SIZE)
+                stored = int.from_bytes(raw[PAYLOAD_SIZE:], "little")
+                if stored == record_crc(raw):
+                    break
+                good -= RECORD_SIZE
+        if good != size:
+            with open(path, "r+b") as f:
+                f.truncate(good)
+            print(f"[History Log] recovered {os.path.basename(path)}: dropped {size - good} bytes")
+
+    def append(self, timestamps, values, station=0):
+        """Append a batch: timestamps (n,), values (n, parameters) in PARAMETER_KEYS order,
+        station a single id or one per record."""
+        timestamps = np.atleast_1d(np.asarray(timestamps, dtype=np.float64))
+        values = np.atleast_2d(np.asarray(values, dtype=np.float32))
+        if not len(timestamps):
+            return
+        records = np.empty(len(timestamps), dtype=RECORD_DTYPE)
+        records["ts"] = timestamps
+        records["station"] = station
+        records["values"] = values
+        if np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            records, timestamps = records[order], timestamps[order]
+        raw = records.view(np.uint8).reshape(len(records), RECORD_SIZE)
+        records["crc"] = [zlib.crc32(row[:PAYLOAD_SIZE].tobytes()) & 0xFFFFFFFF for row in raw]
+
+        days = (timestamps // SECONDS_PER_DAY).astype(np.int64)
+        for day in np.unique(days):
+            chunk = records[days == day]
+            segment = self.segments.get(int(day))
+            if segment is not None:
+                # The batch is sorted, so the late records are a prefix of it
+                late = int(np.searchsorted(chunk["ts"], segment.last_ts(), side="left"))
+                if late:
+                    self._append_late(segment, chunk[:late])
+                    chunk = chunk[late:]
+                    if not len(chunk):
+                        continue
+            self._writer(int(day)).write(chunk.tobytes())
+            segment = self.segments[int(day)]
+            segment.extend_index(segment.count, chunk["ts"])
+            segment.count += len(chunk)
+            self._file.flush()
+
+    def _append_late(self, segment, records):
+        with open(segment.late_path, "ab") as f:
+            f.write(records.tobytes())
+        segment.add_late(records)
+        if segment.late_count() > MAX_LATE_RECORDS:
+            self._fold(segment)
+
+    def _fold(self, segment):
+        """Merge the side file into the segment through a new file and an atomic rename."""
+        if self._file is not None and self.segments.get(self._active_day) is segment:
+            # Appends must not go to the file being replaced
+            self._file.close()
+            self._file = None
+            self._active_day = None
+        late = sort_records(np.concatenate(segment.late_runs))
+        records = segment.records()
+        start = int(np.searchsorted(records["ts"], late["ts"][0], side="right"))
+        head = [records[i:min(i + COPY_RECORDS, start)] for i in range(0, start, COPY_RECORDS)]
+        tail = sort_records(np.concatenate([np.array(records[start:]), late]))
+        write_atomic(segment.path, head + [tail])
+        os.remove(segment.late_path)
+        segment.close()
+        segment.late_runs = []
+        segment.count = start + len(tail)
+        segment.index = segment.index[:-(-start // INDEX_STRIDE)]
+        segment.extend_index(start, tail["ts"])
+
+    def _writer(self, day):
+        if day != self._active_day:
+            if self._file is not None:
+                self._file.close()
+                self.apply_retention()
+            path = os.path.join(self.directory, segment_name(day))
+            if day not in self.segments:
+                self.segments[day] = Segment(path)
+            self._file = open(path, "ab")
+            self._active_day = day
+        return self._file
+
+    def query(self, start, end, station=None):
+        """Yield memory-mapped record slices with start <= ts < end, oldest first."""
+        for day in sorted(self.segments):
+            if day < day_of(start) or day > day_of(end):
+                continue
+            segment = self.segments[day]
+            lo, hi = segment.locate(start, end)
+            late = segment.late_in(start, end)
+            if late:
+                chunk = sort_records(np.concatenate([np.array(segment.records()[lo:hi])] + late))
+            elif hi > lo:
+                chunk = segment.records()[lo:hi]
+            else:
+                continue
+            if station is not None:
+                chunk = chunk[chunk["station"] == station]
+            yield chunk
+
+    def read_range(self, start, end, key=None, station=None, max_points=None):
+        """Timestamps and values of one parameter (every parameter when key is None),
+        stride-decimated to about max_points."""
+        column = PARAMETER_KEYS.index(key) if key is not None else slice(None)
+        chunks = list(self.query(start, end, station))
+        total = sum(len(c) for c in chunks)
+        step = max(1, total // max_points) if max_points else 1
+        ts = [c["ts"][::step] for c in chunks]
+        vals = [c["values"][::step, column] for c in chunks]
+        if not ts:
+            shape = (0,) if key is not None else (0, len(PARAMETER_KEYS))
+            return np.empty(0), np.empty(shape, dtype=np.float32)
+        return np.concatenate(ts), np.concatenate(vals)
+
+    def apply_retention(self, now=None):
+        cutoff = day_of(time.time() if now is None else now) - self.retention_days
+        for day in [d for d in self.segments if d < cutoff]:
+            segment = self.segments.pop(day)
+            segment.close()
+            for path in (segment.path, segment.late_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print("[History Log] retention failed:", e)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._active_day = None
+        for segment in self.segments.values():
+            segment.close()
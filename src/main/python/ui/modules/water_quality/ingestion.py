@@ -0,0 +1,328 @@
+import json
+import random
+import socket
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit, parse_qsl
+
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS, value_range
+
+# Sensor frames are one line each, either CSV in the fixed order
+#   ts,station,ph,do,temperature,tds,turbidity,conductivity
+# (ts may be empty to use the receive time) or a JSON object with the same keys.
+
+QUEUE_CAPACITY = 200_000     # samples buffered between the reader threads and the GUI
+READ_TIMEOUT = 0.5           # seconds; bounds how long stop() waits for a reader
+STATION_IDS = range(0, 1 << 32)   # station ids are stored as uint32
+
+
+def parse_frame(line, received_at=None):
+    """Return (ts, station, values) or None for an unparseable frame."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="replace")
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith("{"):
+            data = json.loads(line)
+            ts = float(data.get("ts") or received_at or time.time())
+            station = int(data.get("station", 0))
+            values = tuple(float(data[key]) for key in PARAMETER_KEYS)
+        else:
+            fields = line.split(",")
+            if len(fields) != 2 + len(PARAMETER_KEYS):
+                return None
+            ts = float(fields[0]) if fields[0] else (received_at or time.time())
+            station = int(fields[1] or 0)
+            values = tuple(float(f) for f in fields[2:])
+    except (ValueError, KeyError, TypeError):
+        return None
+    if station not in STATION_IDS:
+        return None
+    return ts, station, values
+
+
+def to_arrays(samples):
+    """Columns (ts, stations, values) of drained samples, plus how many were skipped.
+
+    Samples that do not fit the column types are skipped one by one instead
+    of failing the whole batch.
+    """
+    n = len(samples)
+    try:
+        ts = np.fromiter((s[0] for s in samples), dtype=np.float64, count=n)
+        stations = np.fromiter((s[1] for s in samples), dtype=np.uint32, count=n)
+        values = np.array([s[2] for s in samples], dtype=np.float32).reshape(n, len(PARAMETER_KEYS))
+        return ts, stations, values, 0
+    except (OverflowError, ValueError, TypeError, IndexError):
+        pass
+    good = []
+    for sample in samples:
+        try:
+            row = (float(sample[0]), int(sample[1]), np.array(sample[2], dtype=np.float32))
+        except (OverflowError, ValueError, TypeError, IndexError):
+            continue
+        if row[1] in STATION_IDS and row[2].shape == (len(PARAMETER_KEYS),):
+            good.append(row)
+    ts = np.array([row[0] for row in good], dtype=np.float64)
+    stations = np.array([row[1] for row in good], dtype=np.uint32)
+    values = np.array([row[2] for row in good], dtype=np.float32).reshape(len(good), len(PARAMETER_KEYS))
+    return ts, stations, values, n - len(good)
+
+
+def format_frame(ts, station, values):
+    return ",".join([f"{ts:.3f}", str(station)] + [f"{v:.4f}" for v in values]) + "\n"
+
+
+class SampleQueue:
+    """Bounded multi-producer/single-consumer queue of parsed samples.
+
+    Every source thread puts into the same queue; producers share a lock so
+    the capacity check and the counters stay exact. deque.popleft is atomic
+    in CPython, so the GUI drains without taking it. When the GUI falls
+    behind, new samples are refused and counted in `dropped` instead of
+    silently replacing old ones.
+    """
+
+    def __init__(self, capacity=QUEUE_CAPACITY):
+        self.capacity = capacity
+        self._items = deque()
+        self._put_lock = threading.Lock()
+        self.accepted = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, sample):
+        with self._put_lock:
+            if len(self._items) >= self.capacity:
+                self.dropped += 1
+                return False
+            self._items.append(sample)
+            self.accepted += 1
+            return True
+
+    def drain(self, max_items=None):
+        items = []
+        pop = self._items.popleft
+        n = len(self._items) if max_items is None else min(max_items, len(self._items))
+        for _ in range(n):
+            items.append(pop())
+        return items
+
+
+class SensorSource:
+    """Base class: a daemon thread reading frames and pushing samples to a queue."""
+
+    name = "source"
+
+    def __init__(self):
+        self.queue = None
+        self.frames = 0
+        self.parse_errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self, queue):
+        self.queue = queue
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"water-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * READ_TIMEOUT)
+            self._thread = None
+
+    def running(self):
+        return not self._stop.is_set()
+
+    def _run(self):
+        try:
+            self.run()
+        except Exception as e:
+            print(f"[Water Ingestion] {self.name} stopped:", e)
+        finally:
+            self.close()
+
+    def run(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def feed(self, line, received_at=None):
+        sample = parse_frame(line, received_at)
+        if sample is None:
+            self.parse_errors += 1
+            return
+        self.frames += 1
+        self.queue.put(sample)
+
+
+class SerialSource(SensorSource):
+    """Serial-line sensors through pyserial; 'loop://' gives a local stand-in port."""
+
+    name = "serial"
+
+    def __init__(self, port, baudrate=9600):
+        super().__init__()
+        import serial   # optional dependency, only needed for serial sensors
+        self.port = serial.serial_for_url(port, baudrate=baudrate, timeout=READ_TIMEOUT)
+
+    def run(self):
+        buffer = b""
+        while self.running():
+            chunk = self.port.read(self.port.in_waiting or 1)
+            if not chunk:
+                continue
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            now = time.time()
+            for line in lines:
+                self.feed(line, now)
+
+    def close(self):
+        self.port.close()
+
+
+class UdpSource(SensorSource):
+    """UDP datagrams carrying one or more frames each."""
+
+    name = "udp"
+
+    def __init__(self, host="0.0.0.0", port=9870):
+        super().__init__()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self.sock.bind((host, port))
+        self.sock.settimeout(READ_TIMEOUT)
+        self.address = self.sock.getsockname()
+
+    def run(self):
+        while self.running():
+            try:
+                datagram, _ = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            now = time.time()
+            for line in datagram.split(b"\n"):
+                if line:
+                    self.feed(line, now)
+
+    def close(self):
+        self.sock.close()
+
+
+class LoopbackMqttClient:
+    """In-process stand-in for a paho MQTT client: publish() delivers to subscribers."""
+
+    def __init__(self):
+        self.on_message = None
+        self.topics = set()
+        self._inbox = deque()
+        self._wakeup = threading.Event()
+
+    def connect(self, host, port=1883):
+        pass
+
+    def subscribe(self, topic):
+        self.topics.add(topic)
+
+    def publish(self, topic, payload):
+        self._inbox.append((topic, payload if isinstance(payload, bytes) else payload.encode()))
+        self._wakeup.set()
+
+    def loop(self, timeout=1.0):
+        if not self._inbox:
+            self._wakeup.wait(timeout)
+            self._wakeup.clear()
+        while self._inbox:
+            topic, payload = self._inbox.popleft()
+            if topic in self.topics and self.on_message:
+                self.on_message(self, None, type("Message", (), {"topic": topic, "payload": payload}))
+
+    def disconnect(self):
+        pass
+
+
+class MqttSource(SensorSource):
+    """MQTT topic subscription; uses paho-mqtt unless a client is passed in."""
+
+    name = "mqtt"
+
+    def __init__(self, host="localhost", port=1883, topic="emcs/water", client=None):
+        super().__init__()
+        if client is None:
+            import paho.mqtt.client as mqtt   # optional dependency, only needed for MQTT sensors
+            # paho-mqtt 2.x requires the callback API version; 1.x has no such argument
+            if hasattr(mqtt, "CallbackAPIVersion"):
+                client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2)
+            else:
+                client = mqtt.Client()
+        self.client = client
+        self.host, self.port, self.topic = host, port, topic
+        self.client.on_message = self._on_message
+
+    def _on_message(self, client, userdata, message):
+        now = time.time()
+        for line in message.payload.split(b"\n"):
+            if line:
+                self.feed(line, now)
+
+    def run(self):
+        self.client.connect(self.host, self.port)
+        self.client.subscribe(self.topic)
+        while self.running():
+            self.client.loop(timeout=READ_TIMEOUT)
+
+    def close(self):
+        self.client.disconnect()
+
+
+class EmulatorSource(SensorSource):
+    """Virtual sensor producing uniform random readings, as the dashboard always had."""
+
+    name = "emulator"
+
+    def __init__(self, interval=5.0, station=0):
+        super().__init__()
+        self.interval = interval
+        self.station = station
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            values = tuple(random.uniform(*value_range(key)) for key in PARAMETER_KEYS)
+            self.frames += 1
+            self.queue.put((time.time(), self.station, values))
+
+
+def source_from_url(url):
+    """Build a source from e.g. udp://0.0.0.0:9870, serial:///dev/ttyUSB0?baud=9600,
+    mqtt://broker:1883/emcs/water, emulator://?interval=5 or
+    generator://?rate=1000&stations=20&seed=1 (see load_generator.py)."""
+    parts = urlsplit(url)
+    options = dict(parse_qsl(parts.query))
+    if parts.scheme == "udp":
+        return UdpSource(parts.hostname or "0.0.0.0", parts.port or 9870)
+    if parts.scheme == "serial":
+        return SerialSource(parts.path or parts.netloc, int(options.get("baud", 9600)))
+    if parts.scheme == "mqtt":
+        return MqttSource(parts.hostname or "localhost", parts.port or 1883, parts.path.lstrip("/") or "emcs/water")
+    if parts.scheme == "emulator":
+        return EmulatorSource(float(options.get("interval", 5.0)), int(options.get("station", 0)))
+    if parts.scheme == "generator":
+        from ui.modules.water_quality.load_generator import GeneratorSource
+        seed = options.get("seed")
+        return GeneratorSource(float(options.get("rate", 100)), int(options.get("stations", 1)),
+                               int(seed) if seed is not None else None)
+    raise ValueError(f"unknown sensor source: {url}")
+
@@ -0,0 +1,233 @@
+import argparse
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+from ui.modules.water_quality.ingestion import (
+    SampleQueue, SensorSource, UdpSource, format_frame
+)
+from ui.modules.water_quality.parameters import PARAMETER_KEYS, value_range
+from ui.modules.water_quality.ring_buffer import SensorHistory
+
+# Stand-alone, deterministic load generator for the water pipeline.
+#
+#   python -m ui.modules.water_quality.load_generator --rate 10000 --stations 50 --udp 127.0.0.1:9870
+#   python -m ui.modules.water_quality.load_generator --rate 5000 --benchmark --duration 10
+
+TICK = 0.01                 # seconds between generated batches
+BLOCK = 4096                # samples drawn from the random generator at a time
+MEAN_REVERSION = 0.02       # per second pull back towards the middle of the range
+VOLATILITY = 0.05           # random-walk step per sqrt(second), as a fraction of the range
+
+
+class LoadGenerator:
+    """Produces readings for N stations with drift and spikes, reproducible from a seed.
+
+    Each station follows a mean-reverting random walk inside the emulator
+    range of every parameter; spikes are short excursions that do not
+    change the underlying level.
+
+    The stream is a function of (seed, sample index) only: random numbers
+    are drawn in fixed blocks of BLOCK samples, sample i belongs to
+    station i % stations and is stamped start + (i + 1) / rate. Real-time
+    pacing only decides how the stream is sliced into batches.
+    """
+
+    def __init__(self, rate=100.0, stations=1, seed=None, drift=1.0, spike_rate=0.001, spike_scale=3.0,
+                 start=None):
+        self.rate = rate
+        self.stations = stations
+        self.rng = np.random.default_rng(seed)
+        self.drift = drift
+        self.spike_rate = spike_rate
+        self.spike_scale = spike_scale
+        self.start = start          # timestamp of sample 0; set on first use when None
+
+        ranges = np.array([value_range(key) for key in PARAMETER_KEYS])
+        self.mid = ranges.mean(axis=1)
+        self.span = ranges[:, 1] - ranges[:, 0]
+        self.level = self.mid + self.rng.uniform(-0.25, 0.25, (stations, len(PARAMETER_KEYS))) * self.span
+        self.index = 0              # next sample to hand out
+        self._block = np.empty((0, len(PARAMETER_KEYS)))
+        self._block_start = 0
+
+    def _next_block(self):
+        # Always the same draws in the same order, however the caller slices the stream
+        self._block_start += len(self._block)
+        count = len(PARAMETER_KEYS)
+        step = np.sqrt(self.stations / self.rate) * VOLATILITY * self.drift * self.span
+        noise = self.rng.standard_normal((BLOCK, count)) * step
+        spikes = self.rng.random(BLOCK) < self.spike_rate
+        direction = self.rng.choice([-1.0, 1.0], size=(BLOCK, count))
+        magnitude = self.rng.random((BLOCK, 1))
+
+        # Lay the block out as rounds of one sample per station; the first and last
+        # rounds are partial, and stations outside the block keep their level
+        first = self._block_start % self.stations
+        size = -(-(first + BLOCK) // self.stations) * self.stations
+        rounds = np.zeros((size, count))
+        rounds[first:first + BLOCK] = noise
+        inside = np.zeros(size, dtype=bool)
+        inside[first:first + BLOCK] = True
+        rounds = rounds.reshape(-1, self.stations, count)
+        inside = inside.reshape(-1, self.stations, 1)
+
+        # Mean-reverting random walk, one step per sample of each station
+        pull = min(1.0, MEAN_REVERSION * self.stations / self.rate)
+        keep, target = 1.0 - pull, pull * self.mid
+        last = len(rounds) - 1
+        for i in range(len(rounds)):
+            stepped = keep * self.level + target + rounds[i]
+            self.level = stepped if 0 < i < last else np.where(inside[i], stepped, self.level)
+            rounds[i] = self.level
+        values = rounds.reshape(size, count)[first:first + BLOCK]
+
+        values[spikes] += direction[spikes] * self.spike_scale * self.span * magnitude[spikes]
+        np.maximum(values, 0.0, out=values)
+        self._block = values.astype(np.float32)
+
+    def generate(self, n):
+        """The next n readings of the stream: (ts, stations, values)."""
+        if self.start is None:
+            self.start = time.time()
+        first = self.index
+        parts = []
+        while n > 0:
+            offset = self.index - self._block_start
+            if offset >= len(self._block):
+                self._next_block()
+                offset = 0
+            take = min(n, len(self._block) - offset)
+            parts.append(self._block[offset:offset + take])
+            self.index += take
+            n -= take
+
+        index = np.arange(first, self.index)
+        ts = self.start + (index + 1) / self.rate
+        values = np.concatenate(parts) if parts else np.empty((0, len(PARAMETER_KEYS)), dtype=np.float32)
+        return ts, (index % self.stations).astype(np.uint32), values
+
+    def batches(self, duration=None, tick=TICK):
+        """Yield the readings that have come due, paced in real time at the configured rate."""
+        if self.start is None:
+            self.start = time.time()
+        began = last = time.time()
+        while duration is None or last - began < duration:
+            time.sleep(max(0.0, last + tick - time.time()))
+            last = time.time()
+            due = int((last - self.start) * self.rate) - self.index
+            if due > 0:
+                yield self.generate(due)
+
+
+def encode_batch(ts, stations, values):
+    return "".join(format_frame(t, int(s), v) for t, s, v in zip(ts, stations, values))
+
+
+class GeneratorSource(SensorSource):
+    """Feeds generated frames through the same parser as real sensors."""
+
+    name = "generator"
+
+    def __init__(self, rate=100.0, stations=1, seed=None):
+        super().__init__()
+        self.generator = LoadGenerator(rate, stations, seed)
+
+    def run(self):
+        for ts, stations, values in self.generator.batches():
+            if not self.running():
+                break
+            received = time.time()
+            for line in encode_batch(ts, stations, values).splitlines():
+                self.feed(line, received)
+
+
+def send_udp(generator, address, duration, max_datagram=60000):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sent = 0
+    for ts, stations, values in generator.batches(duration):
+        payload = encode_batch(ts, stations, values).encode()
+        # Split on frame boundaries so every datagram stays under the size limit
+        while payload:
+            cut = payload.rfind(b"\n", 0, max_datagram) + 1 if len(payload) > max_datagram else len(payload)
+            sock.sendto(payload[:cut], address)
+            payload = payload[cut:]
+        sent += len(ts)
+    sock.close()
+    return sent
+
+
+def benchmark(rate, stations, duration, seed, drain_interval=0.033):
+    """Generator -> UDP -> UdpSource -> queue -> batched drain, like the water page."""
+    queue = SampleQueue()
+    source = UdpSource("127.0.0.1", 0)
+    source.start(queue)
+    history = SensorHistory()
+    generator = LoadGenerator(rate, stations, seed)
+
+    sender = threading.Thread(target=send_udp, args=(generator, source.address, duration), daemon=True)
+    started = time.time()
+    sender.start()
+
+    latencies, drained, batch_times = [], 0, []
+    while sender.is_alive() or len(queue):
+        time.sleep(drain_interval)
+        t0 = time.perf_counter()
+        samples = queue.drain()
+        if not samples:
+            continue
+        now = time.time()
+        ts = np.fromiter((s[0] for s in samples), dtype=np.float64, count=len(samples))
+        values = np.array([s[2] for s in samples], dtype=np.float32)
+        history.extend(ts, values)
+        latencies.append(now - ts)
+        drained += len(samples)
+        batch_times.append(time.perf_counter() - t0)
+    elapsed = time.time() - started
+    source.stop()
+
+    latency_ms = np.concatenate(latencies) * 1000 if latencies else np.zeros(1)
+    expected = int(rate * duration)
+    print(f"[Benchmark] rate {rate:.0f}/s, {stations} stations, {duration:.0f}s")
+    print(f"  generated ~{expected}, received {source.frames}, drained {drained}, "
+          f"parse errors {source.parse_errors}, queue drops {queue.dropped}, "
+          f"lost in transport {max(0, expected - source.frames - source.parse_errors)}")
+    print(f"  throughput {drained / elapsed:.0f} samples/s")
+    print(f"  latency ms p50 {np.percentile(latency_ms, 50):.1f}  p95 {np.percentile(latency_ms, 95):.1f}  "
+          f"p99 {np.percentile(latency_ms, 99):.1f}  max {latency_ms.max():.1f}")
+    if batch_times:
+        print(f"  drain cost ms mean {np.mean(batch_times) * 1000:.2f}  max {np.max(batch_times) * 1000:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Water sensor load generator")
+    parser.add_argument("--rate", type=float, default=100.0, help="readings per second over all stations (1-10000)")
+    parser.add_argument("--stations", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None, help="fixed seed for a repeatable stream")
+    parser.add_argument("--duration", type=float, default=None, help="seconds to run (default: forever)")
+    parser.add_argument("--udp", metavar="HOST:PORT", help="send frames to a UDP ingestion source")
+    parser.add_argument("--benchmark", action="store_true", help="measure the in-process ingestion path")
+    args = parser.parse_args(argv)
+
+    if not 1 <= args.rate <= 10000:
+        parser.error("--rate must be between 1 and 10000")
+
+    if args.benchmark:
+        benchmark(args.rate, args.stations, args.duration or 10.0, args.seed)
+        return
+
+    generator = LoadGenerator(args.rate, args.stations, args.seed)
+    if args.udp:
+        host, port = args.udp.rsplit(":", 1)
+        sent = send_udp(generator, (host, int(port)), args.duration)
+        print(f"[Load Generator] sent {sent} readings", file=sys.stderr)
+        return
+    for ts, stations, values in generator.batches(args.duration):
+        sys.stdout.write(encode_batch(ts, stations, values))
+
+
+if __name__ == "__main__":
+    main()
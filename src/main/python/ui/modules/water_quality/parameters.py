@@ -0,0 +1,31 @@
+# Water quality parameters shared by the widget, history store and emulators
+
+# key: (card title, unit, emulator range)
+PARAMETERS = {
+    "ph": ("pH Level", "", (6.5, 8.5)),
+    "do": ("Dissolve Oxygen", "mg/L", (6.0, 9.0)),
+    "temperature": ("Temperature", "°C", (10.0, 30.0)),
+    "tds": ("TDS", "mg/L", (300.0, 900.0)),
+    "turbidity": ("Turbidity", "NTU", (1.0, 100.0)),
+    "conductivity": ("Conductivity", "µS/cm", (400.0, 1000.0)),
+}
+
+PARAMETER_KEYS = tuple(PARAMETERS)
+
+
+def title(key):
+    return PARAMETERS[key][0]
+
+
+def unit(key):
+    return PARAMETERS[key][1]
+
+
+def value_range(key):
+    return PARAMETERS[key][2]
+
+
+def format_value(key, value):
+    suffix = f" {unit(key)}" if unit(key) else ""
+    digits = 2 if key in ("ph", "do") else 1
+    return f"{value:.{digits}f}{suffix}"
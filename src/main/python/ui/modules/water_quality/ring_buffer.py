@@ -0,0 +1,104 @@
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+
+DEFAULT_CAPACITY = 200_000   # ~11 days at one reading every 5 s
+
+
+class RingBuffer:
+    """Fixed-capacity, preallocated ring buffer of scalars.
+
+    Every value is written twice, at i and i + capacity, so the most
+    recent n values are always one contiguous slice of the storage and
+    can be handed out as a view without copying or re-ordering.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._head = 0     # next write position in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        self._data[self._head] = value
+        self._data[self._head + self.capacity] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        if len(values) > self.capacity:
+            values = values[-self.capacity:]
+        n = len(values)
+        if n == 0:
+            return
+        idx = (self._head + np.arange(n)) % self.capacity
+        self._data[idx] = values
+        self._data[idx + self.capacity] = values
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def last(self, n=None):
+        """Read-only view of the newest n values (all of them by default), oldest first."""
+        n = self._count if n is None else min(n, self._count)
+        end = self._head + self.capacity
+        view = self._data[end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def latest(self):
+        return self._data[self._head + self.capacity - 1] if self._count else None
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+
+class SensorHistory:
+    """Timestamped history of every water parameter with bounded memory."""
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, keys=PARAMETER_KEYS):
+        self.capacity = capacity
+        self.keys = tuple(keys)
+        self.timestamps = RingBuffer(capacity, np.float64)
+        self.series = {key: RingBuffer(capacity, np.float32) for key in self.keys}
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, values):
+        self.timestamps.append(timestamp)
+        for key in self.keys:
+            self.series[key].append(values.get(key, np.nan))
+
+    def extend(self, timestamps, values):
+        """Append a batch; values is an (n, len(keys)) array in key order."""
+        values = np.asarray(values)
+        self.timestamps.extend(timestamps)
+        for i, key in enumerate(self.keys):
+            self.series[key].extend(values[:, i])
+
+    def last(self, n=None):
+        return self.timestamps.last(n), {key: buf.last(n) for key, buf in self.series.items()}
+
+    def window(self, seconds, now=None):
+        """Views of the readings from the last `seconds` seconds."""
+        ts = self.timestamps.last()
+        if not len(ts):
+            return self.last(0)
+        now = ts[-1] if now is None else now
+        start = np.searchsorted(ts, now - seconds, side="left")
+        return self.last(len(ts) - start)
+
+    def clear(self):
+        self.timestamps.clear()
+        for buf in self.series.values():
+            buf.clear()
+
+    def latest(self):
+        if not len(self):
+            return None
+        return {key: float(buf.latest()) for key, buf in self.series.items()}
@@ -0,0 +1,335 @@
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+
+WINDOWS = {"1 min": 60, "1 h": 60 * 60, "24 h": 24 * 60 * 60}
+RAW_WINDOW_SECONDS = 60      # windows up to this long keep every sample
+BUCKETS = 120                # aggregate buckets per longer window
+INITIAL_CAPACITY = 1024
+
+# Rolling min/max/mean/stddev/EWMA of every parameter. Batches are folded in
+# with array operations, never per sample in Python.
+#
+# Short windows keep their raw samples so they can leave the window exactly,
+# and maintain running aggregates on the way in and out: monotonic queues for
+# min/max and Welford count/mean/M2 combined batch-wise, so each sample costs
+# O(1) amortized and a snapshot does not rescan the window. Long windows keep
+# BUCKETS aggregates (count, sum, sum of squares, min, max) and slide one
+# bucket at a time, so their memory does not grow with the sample rate (see
+# BucketWindow for what that costs in accuracy).
+
+
+def ewma_step(previous, last_ts, ts, x, seconds):
+    """Time-aware EWMA after the readings x at times ts, continuing from
+    `previous` set at `last_ts`; equivalent to applying
+    e += (1 - exp(-dt / seconds)) * (x - e) once per reading."""
+    if previous != previous:   # NaN: first reading seeds the average
+        previous, last_ts, ts, x = x[0], ts[0], ts[1:], x[1:]
+        if not len(x):
+            return previous
+    # Effective time: backwards steps count as zero, as in the per-sample form
+    elapsed = np.cumsum(np.maximum(np.diff(ts, prepend=last_ts), 0.0))
+    remaining = np.exp(-(elapsed[-1] - elapsed) / seconds)          # decay still ahead of each reading
+    alpha = 1.0 - np.exp(-np.diff(elapsed, prepend=0.0) / seconds)
+    return previous * np.exp(-elapsed[-1] / seconds) + float(np.sum(alpha * x * remaining))
+
+
+class Window:
+    def __init__(self, seconds, width):
+        self.seconds = seconds
+        self.now = -np.inf
+        self.ewma = np.full(width, np.nan)
+        self.ewma_ts = np.full(width, np.nan)
+
+    def update_ewma(self, ts, values):
+        for column in range(values.shape[1]):
+            valid = ~np.isnan(values[:, column])
+            if valid.any():
+                self.ewma[column] = ewma_step(self.ewma[column], self.ewma_ts[column],
+                                              ts[valid], values[valid, column], self.seconds)
+                self.ewma_ts[column] = ts[valid][-1]
+
+    def expire(self, now):
+        self.now = max(self.now, now)
+
+
+def moments(x):
+    """Count, mean and sum of squared deviations of each column, ignoring NaN."""
+    valid = ~np.isnan(x)
+    n = valid.sum(axis=0)
+    mean = np.where(valid, x, 0.0).sum(axis=0) / np.maximum(n, 1)
+    m2 = np.where(valid, (x - mean) ** 2, 0.0).sum(axis=0)
+    return n, mean, m2
+
+
+class MonotonicQueue:
+    """Sliding-window minimum: (seq, value) pairs with strictly increasing values.
+
+    A value can only become the minimum while everything pushed after it is
+    larger, so nothing else is kept. Pushes and expiries take whole batches
+    with searchsorted; every value is stored and dropped at most once.
+    """
+
+    def __init__(self):
+        self.seq = np.empty(INITIAL_CAPACITY, dtype=np.int64)
+        self.value = np.empty(INITIAL_CAPACITY)
+        self.start = 0
+        self.end = 0
+
+    def push(self, seq, x):
+        if not len(x):
+            return
+        # Keep the values below everything after them in the batch...
+        later = np.r_[np.minimum.accumulate(x[::-1])[::-1][1:], np.inf]
+        keep = x < later
+        seq, x = seq[keep], x[keep]
+        # ...and the queued values below the whole batch
+        self.end = self.start + int(np.searchsorted(self.value[self.start:self.end], x[0], "left"))
+        n = len(x)
+        if self.end + n > len(self.seq):
+            self._make_room(n)
+        self.seq[self.end:self.end + n] = seq
+        self.value[self.end:self.end + n] = x
+        self.end += n
+
+    def _make_room(self, n):
+        live = self.end - self.start
+        capacity = len(self.seq)
+        while live + n > capacity // 2:
+            capacity *= 2
+        seq, value = np.empty(capacity, dtype=np.int64), np.empty(capacity)
+        seq[:live] = self.seq[self.start:self.end]
+        value[:live] = self.value[self.start:self.end]
+        self.seq, self.value, self.start, self.end = seq, value, 0, live
+
+    def expire(self, first_seq):
+        """Drop the values pushed before sequence number first_seq."""
+        self.start += int(np.searchsorted(self.seq[self.start:self.end], first_seq, "left"))
+
+    def peek(self):
+        return self.value[self.start] if self.start < self.end else None
+
+
+class RawWindow(Window):
+    """Every sample of a short window, oldest first, in growable arrays, with
+    running aggregates updated as samples enter and leave."""
+
+    def __init__(self, seconds, width):
+        super().__init__(seconds, width)
+        self.ts = np.empty(INITIAL_CAPACITY)
+        self.values = np.empty((INITIAL_CAPACITY, width), dtype=np.float32)
+        self.start = 0
+        self.end = 0
+        self.base = 0   # sequence number of array position 0
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.lowest = [MonotonicQueue() for _ in range(width)]
+        self.highest = [MonotonicQueue() for _ in range(width)]   # negated values
+
+    def extend(self, ts, values):
+        n = len(ts)
+        if self.end + n > len(self.ts):
+            self._make_room(n)
+        self.ts[self.end:self.end + n] = ts
+        self.values[self.end:self.end + n] = values
+        seq = self.base + self.end + np.arange(n)
+        self.end += n
+
+        x = np.asarray(values, dtype=np.float64)
+        self._add(*moments(x))
+        for column in range(x.shape[1]):
+            valid = ~np.isnan(x[:, column])
+            self.lowest[column].push(seq[valid], x[valid, column])
+            self.highest[column].push(seq[valid], -x[valid, column])
+        self.update_ewma(ts, values)
+        self.expire(ts.max())
+
+    def _add(self, n, mean, m2):
+        # Chan et al.'s pairwise form of Welford's update, one batch at a time
+        total = self.count + n
+        delta = mean - self.mean
+        share = np.divide(n, total, out=np.zeros(len(n)), where=total > 0)
+        self.mean = self.mean + delta * share
+        self.m2 = self.m2 + m2 + delta * delta * self.count * share
+        self.count = total
+
+    def _remove(self, n, mean, m2):
+        # The same update run backwards for the samples leaving the window
+        rest = self.count - n
+        kept = rest > 0
+        rest_mean = np.divide(self.count * self.mean - n * mean, rest, out=np.zeros(len(n)), where=kept)
+        delta = mean - rest_mean
+        share = np.divide(n, self.count, out=np.zeros(len(n)), where=self.count > 0)
+        m2 = self.m2 - m2 - delta * delta * rest * share
+        self.mean = rest_mean
+        self.m2 = np.where(kept, np.maximum(m2, 0.0), 0.0)
+        self.count = rest
+
+    def _make_room(self, n):
+        live = self.end - self.start
+        capacity = len(self.ts)
+        while live + n > capacity // 2:
+            capacity *= 2
+        ts = np.empty(capacity)
+        values = np.empty((capacity, self.values.shape[1]), dtype=np.float32)
+        ts[:live] = self.ts[self.start:self.end]
+        values[:live] = self.values[self.start:self.end]
+        self.ts, self.values = ts, values
+        self.base += self.start
+        self.start, self.end = 0, live
+
+    def expire(self, now):
+        super().expire(now)
+        cutoff = self.now - self.seconds
+        if self.start == self.end or self.ts[self.start] > cutoff:
+            return
+        # Samples leave from the front, like a queue
+        live = self.ts[self.start:self.end] > cutoff
+        start = self.start + int(np.argmax(live)) if live.any() else self.end
+        self._remove(*moments(self.values[self.start:start].astype(np.float64)))
+        self.start = start
+        for queue in self.lowest + self.highest:
+            queue.expire(self.base + start)
+
+    def snapshot(self):
+        result = []
+        for column, n in enumerate(self.count):
+            if not n:
+                result.append(None)
+                continue
+            result.append({
+                "count": int(n),
+                "min": float(self.lowest[column].peek()),
+                "max": float(-self.highest[column].peek()),
+                "mean": float(self.mean[column]),
+                "std": float(np.sqrt(self.m2[column] / (n - 1))) if n > 1 else 0.0,
+                "ewma": float(self.ewma[column]),
+            })
+        return result
+
+
+class BucketWindow(Window):
+    """A long window as BUCKETS per-bucket aggregates in a ring, indexed by bucket number.
+
+    Samples are only dropped a whole bucket at a time, so a snapshot covers
+    every bucket that overlaps the window: it starts at the beginning of the
+    oldest such bucket, up to seconds / BUCKETS (30 s for 1 h, 12 min for
+    24 h) before now - seconds. Count, mean, stddev, min and max all include
+    those samples; the EWMA does not depend on the buckets.
+    """
+
+    def __init__(self, seconds, width, buckets=BUCKETS):
+        super().__init__(seconds, width)
+        self.buckets = buckets
+        self.bucket_seconds = seconds / buckets
+        self.ids = np.full(buckets, np.iinfo(np.int64).min)
+        self.count = np.zeros((buckets, width), dtype=np.int64)
+        # Sums are taken around a per-parameter offset so the variance keeps its precision
+        self.offset = None
+        self.sum = np.zeros((buckets, width))
+        self.sumsq = np.zeros((buckets, width))
+        self.min = np.full((buckets, width), np.inf)
+        self.max = np.full((buckets, width), -np.inf)
+
+    def newest_bucket(self):
+        return int(np.floor(self.now / self.bucket_seconds))
+
+    def extend(self, ts, values):
+        values = values.astype(np.float64)
+        valid = ~np.isnan(values)
+        if self.offset is None:
+            seen = valid.sum(axis=0)
+            self.offset = np.where(seen > 0, np.where(valid, values, 0.0).sum(axis=0) / np.maximum(seen, 1), 0.0)
+        self.update_ewma(ts, values)
+        self.expire(ts.max())
+
+        bucket = np.floor(ts / self.bucket_seconds).astype(np.int64)
+        inside = bucket > self.newest_bucket() - self.buckets
+        if not inside.all():
+            bucket, values, valid = bucket[inside], values[inside], valid[inside]
+        if not len(bucket):
+            return
+
+        order = np.argsort(bucket, kind="stable")
+        bucket, values, valid = bucket[order], values[order], valid[order]
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ids = bucket[starts]
+        shifted = np.where(valid, values - self.offset, 0.0)
+
+        # Buckets in the window are distinct modulo the ring size, so every group has its own slot
+        slots = ids % self.buckets
+        reused = self.ids[slots] != ids
+        if reused.any():
+            stale = slots[reused]
+            self.ids[stale] = ids[reused]
+            self.count[stale] = 0
+            self.sum[stale] = 0.0
+            self.sumsq[stale] = 0.0
+            self.min[stale] = np.inf
+            self.max[stale] = -np.inf
+        self.count[slots] += np.add.reduceat(valid.astype(np.int64), starts)
+        self.sum[slots] += np.add.reduceat(shifted, starts)
+        self.sumsq[slots] += np.add.reduceat(shifted * shifted, starts)
+        self.min[slots] = np.fmin(self.min[slots], np.fmin.reduceat(values, starts))
+        self.max[slots] = np.fmax(self.max[slots], np.fmax.reduceat(values, starts))
+
+    def snapshot(self):
+        live = self.ids > self.newest_bucket() - self.buckets
+        count = self.count[live].sum(axis=0)
+        total = self.sum[live].sum(axis=0)
+        squares = self.sumsq[live].sum(axis=0)
+        lowest = self.min[live].min(axis=0, initial=np.inf)
+        highest = self.max[live].max(axis=0, initial=-np.inf)
+        result = []
+        for column, n in enumerate(count):
+            if not n:
+                result.append(None)
+                continue
+            mean = total[column] / n
+            variance = (squares[column] - n * mean * mean) / (n - 1) if n > 1 else 0.0
+            result.append({
+                "count": int(n),
+                "min": float(lowest[column]),
+                "max": float(highest[column]),
+                "mean": float(self.offset[column] + mean),
+                "std": float(np.sqrt(max(variance, 0.0))),
+                "ewma": float(self.ewma[column]),
+            })
+        return result
+
+
+class RollingStats:
+    """Rolling statistics for every water parameter over every window."""
+
+    def __init__(self, windows=WINDOWS, keys=PARAMETER_KEYS):
+        self.keys = tuple(keys)
+        self.windows = dict(windows)
+        self.stats = {
+            name: (RawWindow if seconds <= RAW_WINDOW_SECONDS else BucketWindow)(seconds, len(self.keys))
+            for name, seconds in self.windows.items()
+        }
+
+    def update(self, ts, values):
+        """values: mapping key -> value for one reading."""
+        self.extend([ts], [[values.get(key, np.nan) for key in self.keys]])
+
+    def extend(self, timestamps, values):
+        """Batch of readings; values is (n, len(keys)) in key order."""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if not len(timestamps):
+            return
+        values = np.asarray(values, dtype=np.float32).reshape(len(timestamps), len(self.keys))
+        for window in self.stats.values():
+            window.extend(timestamps, values)
+
+    def expire(self, now):
+        """Slide every window up to `now`, so a quiet station's statistics run out."""
+        for window in self.stats.values():
+            window.expire(now)
+
+    def get(self, key, window):
+        return self.snapshot(window)[key]
+
+    def snapshot(self, window):
+        return dict(zip(self.keys, self.stats[window].snapshot()))
@@ -0,0 +1,148 @@
+import time
+
+import numpy as np
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QColor, QPainter
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS, format_value, title
+from ui.modules.water_quality.wqi import category
+
+# Latest reading of every station as one row; the view asks for what it shows,
+# so repaint work follows the visible rows rather than the number of stations.
+
+VALUE_ROLE = Qt.UserRole   # raw float behind a formatted cell
+
+STATION_COLUMN = 0
+FIRST_VALUE_COLUMN = 1
+WQI_COLUMN = FIRST_VALUE_COLUMN + len(PARAMETER_KEYS)
+SEEN_COLUMN = WQI_COLUMN + 1
+HEADERS = ["Station"] + [title(key) for key in PARAMETER_KEYS] + ["WQI", "Updated"]
+
+CATEGORY_COLORS = {
+    "Excellent": "#16a34a",
+    "Good": "#65a30d",
+    "Poor": "#f59e0b",
+    "Very Poor": "#ea580c",
+    "Unsuitable": "#dc2626",
+}
+
+
+class StationTableModel(QAbstractTableModel):
+    """Per-station latest values kept in NumPy arrays, one row per station."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.ids = []            # station id of each row
+        self.row_of = {}         # station id -> row
+        width = len(PARAMETER_KEYS)
+        self.values = np.empty((0, width), dtype=np.float32)
+        self.wqi = np.empty(0, dtype=np.float32)
+        self.seen = np.empty(0, dtype=np.float64)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.ids)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role not in (Qt.DisplayRole, VALUE_ROLE):
+            return None
+
+        if col == STATION_COLUMN:
+            return self.ids[row] if role == VALUE_ROLE else f"Station {self.ids[row]}"
+        if col == SEEN_COLUMN:
+            ts = float(self.seen[row])
+            return ts if role == VALUE_ROLE else time.strftime("%H:%M:%S", time.localtime(ts))
+        if col == WQI_COLUMN:
+            value = float(self.wqi[row])
+            return value if role == VALUE_ROLE else ("--" if value != value else f"{value:.1f}")
+        value = float(self.values[row, col - FIRST_VALUE_COLUMN])
+        if role == VALUE_ROLE:
+            return value
+        return "--" if value != value else format_value(PARAMETER_KEYS[col - FIRST_VALUE_COLUMN], value)
+
+    def station_at(self, row):
+        return self.ids[row] if 0 <= row < len(self.ids) else None
+
+    def row_for(self, station):
+        return self.row_of.get(station)
+
+    def update(self, timestamps, stations, values, wqi):
+        """Take the newest reading per station from a batch and signal only changed cells."""
+        if not len(stations):
+            return
+        # Last occurrence of every station in the batch
+        ids, first_reversed = np.unique(stations[::-1], return_index=True)
+        last = len(stations) - 1 - first_reversed
+
+        new = [int(s) for s in ids if int(s) not in self.row_of]
+        if new:
+            self.add_stations(new)
+
+        rows = np.array([self.row_of[int(s)] for s in ids])
+        # Compare at the stored precision, or a float64 score never equals its float32 copy
+        latest = np.asarray(values[last], dtype=self.values.dtype)
+        score = np.asarray(wqi[last], dtype=self.wqi.dtype)
+        cells = np.column_stack([
+            latest,
+            score,
+            np.floor(timestamps[last]),     # clock column only changes once a second
+        ])
+        current = np.column_stack([self.values[rows], self.wqi[rows], np.floor(self.seen[rows])])
+        changed = ~((cells == current) | (np.isnan(cells) & np.isnan(current)))
+
+        self.values[rows] = latest
+        self.wqi[rows] = score
+        self.seen[rows] = timestamps[last]
+
+        for row, mask in zip(rows[changed.any(axis=1)], changed[changed.any(axis=1)]):
+            cols = np.flatnonzero(mask) + FIRST_VALUE_COLUMN
+            self.dataChanged.emit(self.index(int(row), int(cols[0])), self.index(int(row), int(cols[-1])),
+                                  [Qt.DisplayRole])
+
+    def add_stations(self, stations):
+        # New stations are appended in id order so existing rows keep their position
+        first = len(self.ids)
+        self.beginInsertRows(QModelIndex(), first, first + len(stations) - 1)
+        for station in sorted(stations):
+            self.row_of[station] = len(self.ids)
+            self.ids.append(station)
+        extra = len(stations)
+        self.values = np.vstack([self.values, np.full((extra, self.values.shape[1]), np.nan, dtype=np.float32)])
+        self.wqi = np.concatenate([self.wqi, np.full(extra, np.nan, dtype=np.float32)])
+        self.seen = np.concatenate([self.seen, np.zeros(extra)])
+        self.endInsertRows()
+
+
+class StationDelegate(QStyledItemDelegate):
+    """Paints the WQI column as a coloured badge; other cells use the default painting."""
+
+    def paint(self, painter, option, index):
+        score = index.data(VALUE_ROLE)
+        if index.column() != WQI_COLUMN or score is None or score != score:
+            super().paint(painter, option, index)
+            return
+
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        label = category(score)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(CATEGORY_COLORS.get(label, "#6b7280")))
+        painter.drawRoundedRect(option.rect.adjusted(4, 3, -4, -3), 6, 6)
+        painter.setPen(QColor("#ffffff"))
+        painter.drawText(option.rect, Qt.AlignCenter, f"{score:.0f} · {label}")
+        painter.restore()
@@ -1,13 +1,54 @@
-import random
+import os
+import time
+from functools import partial
+
+import numpy as np
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QFrame, QFileDialog, QSizePolicy, QTextEdit
+    QFrame, QFileDialog, QSizePolicy, QTextEdit, QComboBox,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTableView, QAbstractItemView,
+    QListWidget, QListWidgetItem
 )
 from PyQt5.QtGui import QFont, QColor, QPixmap
-from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtCore import Qt
 
 import pyqtgraph as pg
 
+from ui.modules.water_quality.downsample import MODES, DownsampledSeries
+from ui.modules.water_quality.history_log import HistoryLog
+from ui.modules.water_quality.ingestion import SampleQueue, source_from_url, to_arrays
+from ui.modules.water_quality.parameters import PARAMETER_KEYS, format_value, title
+from ui.modules.water_quality.ring_buffer import RingBuffer, SensorHistory
+from ui.modules.water_quality.rolling_stats import WINDOWS, RollingStats
+from ui.modules.water_quality.station_model import StationDelegate, StationTableModel
+from ui.modules.water_quality.wqi import category, compute_wqi
+from ui.services.alert_rules import RuleEngine, load_rules
+from ui.services.refresh_scheduler import RefreshScheduler
+
+# Comma-separated source URLs, e.g. "udp://0.0.0.0:9870,serial:///dev/ttyUSB0?baud=9600"
+SOURCE_URLS = os.environ.get("EMCS_WATER_SOURCES", "emulator://?interval=5").split(",")
+DRAIN_INTERVAL_MS = 33          # ~30 FPS
+HIDDEN_DRAIN_SECONDS = 1.0      # keep logging and alerting while the page is hidden, just less often
+MAX_DRAIN_BATCH = 50000         # samples taken per frame; the rest waits for the next one
+
+PLOT_WINDOW_SECONDS = 60 * 60   # readings replayed into the rolling stats on start-up
+POINTS_PER_PIXEL = 2            # per curve, picked from the downsampling tiers
+MIN_PLOT_WIDTH = 400
+WQI_TITLE = "Water Quality Index"
+STATS_REFRESH_SECONDS = 0.5    # stats panel repaint throttle
+ARCHIVE_OVERSAMPLE = 4          # on-disk readings per chart point, before LTTB/min-max thins them
+CARD_STATS_WINDOW = "1 h"
+STATION_ROW_HEIGHT = 26         # fixed, so the grid never measures off-screen rows
+MAX_ALERT_ROWS = 200            # newest first; older entries are dropped
+SEVERITY_COLORS = {"info": "#2563eb", "warning": "#d97706", "critical": "#dc2626"}
+STATS_COLUMNS = [("Min", "min"), ("Max", "max"), ("Mean", "mean"), ("Std", "std"), ("EWMA", "ewma"), ("N", "count")]
+CHART_RANGES = {
+    "Last hour": PLOT_WINDOW_SECONDS,
+    "Last 24 hours": 24 * 60 * 60,
+    "Last 7 days": 7 * 24 * 60 * 60,
+    "Last 30 days": 30 * 24 * 60 * 60,
+}
+
 class WaterQualityWidget(QWidget):
     def __init__(self):
         super().__init__()
@@ -15,10 +56,34 @@ class WaterQualityWidget(QWidget):
         self.setStyleSheet("background-color: #f5f5f5; color: #1f2937;")
 
         self.cards = {}   # Dictionary to hold card label references
+        self.card_stats = {}
         self.pm_plot_widget = None  # For graph access
+        self.curves = {}
+        self.history = SensorHistory()  # bounded per-parameter history
+        self.history_log = None  # on-disk history, one segment per day
+        self.stats = RollingStats()  # rolling min/max/mean/std/EWMA, folded in per batch
+        self.wqi_history = RingBuffer(self.history.capacity, np.float32)  # aligned with history
+        # Charted series with LTTB and min/max tiers over the raw ring buffers
+        self.chart_series = {
+            "ph": DownsampledSeries(self.history.timestamps, self.history.series["ph"],
+                                    archive=partial(self.read_archive, "ph")),
+            "do": DownsampledSeries(self.history.timestamps, self.history.series["do"],
+                                    archive=partial(self.read_archive, "do")),
+            "wqi": DownsampledSeries(self.history.timestamps, self.wqi_history,
+                                     archive=partial(self.read_archive, "wqi")),
+        }
+        self.follow_latest = True  # keep the chart on the newest readings until the user pans
+        self.stats_refreshed_at = 0.0
+        self.view_stale = False  # readings arrived while the page was hidden
+        self.alerts = RuleEngine(load_rules(), PARAMETER_KEYS)  # evaluated over every drained batch
+
+        self.station = 0  # station shown on the cards and chart
+        self.station_model = StationTableModel(self)  # latest reading of every station
+        self.reported_drops = 0
 
         self.init_ui()
-        self.start_emulator()  # Start virtual sensor
+        self.open_history_log()
+        self.start_ingestion()  # Start sensor sources (virtual sensor by default)
 
     def init_ui(self):
         main_layout = QVBoxLayout()
@@ -41,11 +106,20 @@ class WaterQualityWidget(QWidget):
         cards_layout.addWidget(self.create_card("Conductivity", "--"))
         main_layout.addLayout(cards_layout)
 
+        # Overall score (3rd row)
+        cards_layout = QHBoxLayout()
+        cards_layout.addWidget(self.create_card(WQI_TITLE, "--"))
+        main_layout.addLayout(cards_layout)
+
+        # Every station, latest values; selecting a row opens its detail below
+        main_layout.addWidget(self.create_station_grid(), stretch=1)
+
         # Chart area
         chart_layout = QHBoxLayout()
         chart_layout.setSpacing(10)
-        chart_layout.addWidget(self.create_graph("pH/DO"))
-        main_layout.addLayout(chart_layout)
+        chart_layout.addWidget(self.create_graph("pH/DO"), stretch=3)
+        chart_layout.addWidget(self.create_stats_panel(), stretch=2)
+        main_layout.addLayout(chart_layout, stretch=2)
 
         self.setLayout(main_layout)
 
@@ -67,15 +141,129 @@ class WaterQualityWidget(QWidget):
         title_lbl.setFont(QFont("Arial", 14, QFont.Bold))
         value_lbl = QLabel(value)
         value_lbl.setFont(QFont("Arial", 12, QFont.Bold))
+        stats_lbl = QLabel("")
+        stats_lbl.setFont(QFont("Arial", 9))
+        stats_lbl.setStyleSheet("color: #6b7280;")
         layout.addWidget(title_lbl)
         layout.addWidget(value_lbl)
+        layout.addWidget(stats_lbl)
         card.setLayout(layout)
         card.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Preferred)
         
         self.cards[title] = value_lbl  # Store reference for later
+        self.card_stats[title] = stats_lbl
         return card
 
 
+    def create_station_grid(self):
+        self.station_view = QTableView()
+        self.station_view.setModel(self.station_model)
+        self.station_view.setItemDelegate(StationDelegate(self.station_view))
+        self.station_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.station_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.station_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.station_view.setAlternatingRowColors(True)
+        self.station_view.setStyleSheet("""
+            QTableView {
+                background-color: #ffffff;
+                border: 1px solid #e5e7eb;
+                border-radius: 12px;
+            }
+        """)
+        rows = self.station_view.verticalHeader()
+        rows.setSectionResizeMode(QHeaderView.Fixed)
+        rows.setDefaultSectionSize(STATION_ROW_HEIGHT)
+        rows.hide()
+        self.station_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.station_view.selectionModel().currentRowChanged.connect(self.on_station_selected)
+        return self.station_view
+
+    def on_station_selected(self, current, previous):
+        station = self.station_model.station_at(current.row())
+        if station is not None:
+            self.select_station(station)
+
+    def select_station(self, station):
+        if station == self.station:
+            return
+        self.station = station
+        self.graph_title.setText(f"pH/DO · Station {station}")
+
+        # Only the selected station keeps history in memory; reload it from disk
+        self.history.clear()
+        self.wqi_history.clear()
+        for series in self.chart_series.values():
+            series.clear()
+        self.stats = RollingStats()
+        self.load_station_history()
+
+        for card_title in self.cards:
+            self.cards[card_title].setText("--")
+            self.card_stats[card_title].setText("")
+        self.update_cards()
+        self.update_chart()
+        self.update_stats_panel()
+
+    def create_stats_panel(self):
+        frame = QFrame()
+        frame.setStyleSheet("""
+            QFrame {
+                background-color: #ffffff;
+                border: 1px solid #e5e7eb;
+                border-radius: 12px;
+                padding: 10px;
+            }
+        """)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        label = QLabel("Rolling Statistics")
+        label.setFont(QFont("Arial", 12, QFont.Bold))
+        header.addWidget(label, stretch=1)
+        self.stats_window_combo = QComboBox()
+        self.stats_window_combo.addItems(list(WINDOWS))
+        self.stats_window_combo.setCurrentText(CARD_STATS_WINDOW)
+        self.stats_window_combo.currentTextChanged.connect(self.update_stats_panel)
+        header.addWidget(self.stats_window_combo)
+        layout.addLayout(header)
+
+        self.stats_table = QTableWidget(len(PARAMETER_KEYS), len(STATS_COLUMNS))
+        self.stats_table.setHorizontalHeaderLabels([name for name, _ in STATS_COLUMNS])
+        self.stats_table.setVerticalHeaderLabels([title(key) for key in PARAMETER_KEYS])
+        self.stats_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.stats_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        for row in range(len(PARAMETER_KEYS)):
+            for col in range(len(STATS_COLUMNS)):
+                self.stats_table.setItem(row, col, QTableWidgetItem("--"))
+        layout.addWidget(self.stats_table)
+
+        label = QLabel("Alerts")
+        label.setFont(QFont("Arial", 12, QFont.Bold))
+        layout.addWidget(label)
+        self.alert_list = QListWidget()
+        layout.addWidget(self.alert_list)
+        frame.setLayout(layout)
+        return frame
+
+    def update_stats_panel(self):
+        # Reads the incrementally maintained stats; nothing here rescans history
+        snapshot = self.stats.snapshot(self.stats_window_combo.currentText())
+        for row, key in enumerate(PARAMETER_KEYS):
+            stats = snapshot[key]
+            for col, (_, field) in enumerate(STATS_COLUMNS):
+                text = "--" if stats is None else (str(stats[field]) if field == "count" else f"{stats[field]:.2f}")
+                item = self.stats_table.item(row, col)
+                if item.text() != text:
+                    item.setText(text)
+
+        for key, stats in self.stats.snapshot(CARD_STATS_WINDOW).items():
+            text = "" if stats is None else (
+                f"{CARD_STATS_WINDOW}: {stats['mean']:.2f} ± {stats['std']:.2f}  "
+                f"[{stats['min']:.2f} – {stats['max']:.2f}]")
+            if self.card_stats[title(key)].text() != text:
+                self.card_stats[title(key)].setText(text)
+
     def create_graph(self, title):
         # Frame for rounded corner effect
         frame = QFrame()
@@ -90,49 +278,244 @@ class WaterQualityWidget(QWidget):
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
 
-        # Title label
-        label = QLabel(title)
+        # Title label with the history range selector
+        header = QHBoxLayout()
+        label = QLabel(f"{title} · Station {self.station}")
         label.setFont(QFont("Arial", 12, QFont.Bold))
         label.setAlignment(Qt.AlignCenter)
         label.setStyleSheet("color: #1f2937;")
-        layout.addWidget(label)
+        header.addWidget(label, stretch=1)
+        self.graph_title = label
+
+        self.ingest_label = QLabel("")
+        self.ingest_label.setStyleSheet("color: #6b7280;")
+        header.addWidget(self.ingest_label)
+
+        self.range_combo = QComboBox()
+        self.range_combo.addItems(list(CHART_RANGES))
+        self.range_combo.currentTextChanged.connect(self.follow_live)
+        header.addWidget(self.range_combo)
+
+        self.downsample_combo = QComboBox()
+        self.downsample_combo.addItems(list(MODES))
+        self.downsample_combo.currentTextChanged.connect(self.render_visible)
+        header.addWidget(self.downsample_combo)
+
+        live_btn = QPushButton("Live")
+        live_btn.clicked.connect(self.follow_live)
+        header.addWidget(live_btn)
+        layout.addLayout(header)
 
         # Plot widget with multi-line graph
-        self.pm_plot_widget = pg.PlotWidget()
+        self.pm_plot_widget = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem()})
         self.pm_plot_widget.setBackground("#ffffff")
         self.pm_plot_widget.setLabel("left", "Level", **{"color": "#1f2937", "font-size": "12px"})
         self.pm_plot_widget.setLabel("bottom", "Time", **{"color": "#1f2937", "font-size": "12px"})
         self.pm_plot_widget.showGrid(x=True, y=True)
 
+        # Curves are created once and updated in place with only the points
+        # of the visible range, taken from the tier that fits the plot width
+        self.curves = {
+            "ph": self.pm_plot_widget.plot(pen=pg.mkPen("#2563eb", width=2), name="pH"),
+            "do": self.pm_plot_widget.plot(pen=pg.mkPen("#10b981", width=2), name="DO"),
+        }
+
+        # Water Quality Index below, following the same time axis
+        self.wqi_plot_widget = pg.PlotWidget(axisItems={"bottom": pg.DateAxisItem()})
+        self.wqi_plot_widget.setBackground("#ffffff")
+        self.wqi_plot_widget.setLabel("left", "WQI", **{"color": "#1f2937", "font-size": "12px"})
+        self.wqi_plot_widget.showGrid(x=True, y=True)
+        self.wqi_plot_widget.setMaximumHeight(140)
+        self.wqi_plot_widget.setXLink(self.pm_plot_widget)
+        self.wqi_curve = self.wqi_plot_widget.plot(pen=pg.mkPen("#f59e0b", width=2), name="WQI")
+
+        # Re-pick points whenever the visible range changes; panning or zooming stops following
+        self.pm_plot_widget.getViewBox().sigXRangeChanged.connect(self.render_visible)
+        for plot in (self.pm_plot_widget, self.wqi_plot_widget):
+            plot.getViewBox().sigRangeChangedManually.connect(self.stop_following)
+
         layout.addWidget(self.pm_plot_widget)
+        layout.addWidget(self.wqi_plot_widget)
         frame.setLayout(layout)
         return frame
 
-    def start_emulator(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_fake_sensor_data)
-        self.timer.start(5 * 1000)  # update every 10 seconds
-
-    def update_fake_sensor_data(self):
-        ph = round(random.uniform(6.5, 8.5), 2)
-        oxygen = round(random.uniform(6.0, 9.0), 2)
-        temp = round(random.uniform(10.0, 30.0), 1)
-        tds = round(random.uniform(300, 900), 1)
-        turb = round(random.uniform(1.0, 100.0), 1)
-        cond = round(random.uniform(400, 1000), 1)
-
-        self.cards["pH Level"].setText(f"{ph}")
-        self.cards["Dissolve Oxygen"].setText(f"{oxygen} mg/L")
-        self.cards["Temperature"].setText(f"{temp} °C")
-        self.cards["TDS"].setText(f"{tds} mg/L")
-        self.cards["Turbidity"].setText(f"{turb} NTU")
-        self.cards["Conductivity"].setText(f"{cond} µS/cm")
-
-        # Update graph (basic trend)
-        x = list(range(10))
-        y1 = [random.uniform(6.5, 8.5) for _ in x]  # pH
-        y2 = [random.uniform(6.0, 9.0) for _ in x]  # DO
-
-        self.pm_plot_widget.clear()
-        self.pm_plot_widget.plot(x, y1, pen=pg.mkPen("#2563eb", width=2))
-        self.pm_plot_widget.plot(x, y2, pen=pg.mkPen("#10b981", width=2))
\ No newline at end of file
+    def open_history_log(self):
+        # Seed the in-memory history with the last window persisted on disk
+        try:
+            self.history_log = HistoryLog()
+        except OSError as e:
+            print("[History Log] disabled:", e)
+            return
+        now = time.time()
+        for chunk in self.history_log.query(now - PLOT_WINDOW_SECONDS, now):
+            self.station_model.update(chunk["ts"], chunk["station"], chunk["values"], compute_wqi(chunk["values"]))
+        self.load_station_history()
+        self.update_cards()
+
+    def load_station_history(self):
+        if self.history_log is None:
+            return
+        now = time.time()
+        for chunk in self.history_log.query(now - max(CHART_RANGES.values()), now, station=self.station):
+            wqi = compute_wqi(chunk["values"])
+            self.history.extend(chunk["ts"], chunk["values"])
+            self.wqi_history.extend(wqi)
+            self.extend_chart_series(chunk["ts"], chunk["values"], wqi)
+            recent = chunk["ts"] >= now - PLOT_WINDOW_SECONDS
+            if recent.any():
+                self.stats.extend(chunk["ts"][recent], chunk["values"][recent])
+
+    def read_archive(self, key, start, end, max_points):
+        # Ranges the chart tiers only hold coarsely are read back from disk
+        if self.history_log is None:
+            return None
+        limit = max_points * ARCHIVE_OVERSAMPLE
+        if key == "wqi":
+            ts, values = self.history_log.read_range(start, end, station=self.station, max_points=limit)
+            values = compute_wqi(values)
+        else:
+            ts, values = self.history_log.read_range(start, end, key, self.station, limit)
+        return (ts, values) if len(ts) else None
+
+    def extend_chart_series(self, ts, values, wqi):
+        for key, series in self.chart_series.items():
+            series.extend(ts, wqi if key == "wqi" else values[:, PARAMETER_KEYS.index(key)])
+
+    def start_ingestion(self):
+        # Sensor sources read on their own threads; the GUI drains them at frame rate
+        self.sample_queue = SampleQueue()
+        self.sources = []
+        for url in SOURCE_URLS:
+            try:
+                source = source_from_url(url)
+                source.start(self.sample_queue)
+                self.sources.append(source)
+            except Exception as e:
+                print(f"[Water Ingestion] could not start {url}:", e)
+
+        RefreshScheduler.instance().register(
+            "water", self.drain_samples, DRAIN_INTERVAL_MS / 1000, widget=self,
+            hidden="slow", hidden_interval=HIDDEN_DRAIN_SECONDS, jitter=0)
+
+    def stop_ingestion(self):
+        RefreshScheduler.instance().unregister("water")
+        for source in self.sources:
+            source.stop()
+
+    def shutdown(self):
+        # Called by MainWindow on exit: stop the reader threads, then release the log files
+        self.stop_ingestion()
+        if self.history_log is not None:
+            self.history_log.close()
+            self.history_log = None
+
+    def drain_samples(self):
+        visible = self.isVisible()
+        samples = self.sample_queue.drain(MAX_DRAIN_BATCH if visible else None)
+        self.update_ingest_status()
+        # Windows slide with the clock, so a station that goes quiet runs out of stats
+        self.stats.expire(time.time())
+        if not samples:
+            if visible and self.view_stale:
+                self.refresh_view()
+            elif visible:
+                self.refresh_stats()
+            return
+
+        ts, stations, values, skipped = to_arrays(samples)
+        if skipped:
+            print(f"[Water Ingestion] {skipped} malformed samples skipped")
+        if not len(ts):
+            return
+        if self.history_log is not None:
+            self.history_log.append(ts, values, stations)
+
+        wqi = compute_wqi(values)   # whole batch scored in one vectorized call
+        self.station_model.update(ts, stations, values, wqi)
+        self.show_alerts(self.alerts.evaluate(ts, stations, values))
+
+        mine = stations == self.station
+        if not mine.any():
+            if visible:
+                self.refresh_stats()
+            return
+        self.history.extend(ts[mine], values[mine])
+        self.stats.extend(ts[mine], values[mine])
+        self.wqi_history.extend(wqi[mine])
+        self.extend_chart_series(ts[mine], values[mine], wqi[mine])
+
+        # Hidden pages only keep their data current; painting waits until they are shown
+        self.view_stale = True
+        if visible:
+            self.refresh_view()
+
+    def refresh_view(self):
+        self.view_stale = False
+        self.update_cards()
+        self.update_chart()
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        now = time.monotonic()
+        if now - self.stats_refreshed_at >= STATS_REFRESH_SECONDS:
+            self.stats_refreshed_at = now
+            self.update_stats_panel()
+
+    def update_cards(self):
+        latest = self.history.latest()
+        if latest is None:
+            return
+        for key, value in latest.items():
+            self.cards[title(key)].setText(format_value(key, value))
+        score = float(self.wqi_history.latest())
+        self.cards[WQI_TITLE].setText(f"{score:.1f}")
+        self.card_stats[WQI_TITLE].setText(category(score))
+
+    def show_alerts(self, alerts):
+        for alert in alerts:
+            when = time.strftime("%H:%M:%S", time.localtime(alert.ts))
+            state = "⚠" if alert.raised else "✓ cleared:"
+            item = QListWidgetItem(f"{when}  Station {alert.station}  {state} {alert.message} ({alert.value:.2f})")
+            item.setForeground(QColor(SEVERITY_COLORS[alert.severity] if alert.raised else "#6b7280"))
+            self.alert_list.insertItem(0, item)
+
+            DEBUG = False
+            if DEBUG:
+                print("[Water Alert]", alert)
+        while self.alert_list.count() > MAX_ALERT_ROWS:
+            self.alert_list.takeItem(self.alert_list.count() - 1)
+
+    def update_ingest_status(self):
+        dropped = self.sample_queue.dropped
+        if dropped != self.reported_drops:
+            print(f"[Water Ingestion] queue full: {dropped - self.reported_drops} samples dropped")
+            self.reported_drops = dropped
+            self.ingest_label.setStyleSheet("color: #dc2626;")
+        backlog = len(self.sample_queue)
+        self.ingest_label.setText(f"backlog {backlog} | dropped {dropped}" if dropped or backlog else "")
+
+    def follow_live(self):
+        self.follow_latest = True
+        self.update_chart()
+
+    def stop_following(self, *args):
+        self.follow_latest = False
+
+    def update_chart(self):
+        if not self.follow_latest:
+            self.render_visible()
+            return
+        latest = self.history.timestamps.latest()
+        if latest is None:
+            return
+        # Moving the range emits sigXRangeChanged, which renders the new view
+        span = CHART_RANGES[self.range_combo.currentText()]
+        self.pm_plot_widget.setXRange(latest - span, latest, padding=0)
+
+    def render_visible(self, *args):
+        (start, end), _ = self.pm_plot_widget.viewRange()
+        max_points = POINTS_PER_PIXEL * max(self.pm_plot_widget.width(), MIN_PLOT_WIDTH)
+        mode = self.downsample_combo.currentText()
+        for key, curve in self.curves.items():
+            curve.setData(*self.chart_series[key].view(start, end, max_points, mode))
+        self.wqi_curve.setData(*self.chart_series["wqi"].view(start, end, max_points, mode))
@@ -0,0 +1,73 @@
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+
+# Weighted arithmetic Water Quality Index (Brown et al.), evaluated as
+# NumPy array operations so one call scores a single reading, a history
+# array or a (stations, samples, parameters) cube alike.
+#
+#   q_i = 100 * (V_i - ideal_i) / (S_i - ideal_i)     (pH: |V - 7| / 1.5)
+#   w_i = K / S_i,  K = 1 / sum(1 / S_j)
+#   WQI = sum(q_i * w_i) / sum(w_i)   over the parameters present
+
+# key: (permissible standard S_i, ideal value); None excludes the parameter
+STANDARDS = {
+    "ph": (8.5, 7.0),
+    "do": (5.0, 14.6),
+    "temperature": None,   # no drinking-water standard, reported but not scored
+    "tds": (500.0, 0.0),
+    "turbidity": (5.0, 0.0),
+    "conductivity": (300.0, 0.0),
+}
+
+CATEGORIES = [
+    (25, "Excellent"),
+    (50, "Good"),
+    (75, "Poor"),
+    (100, "Very Poor"),
+    (float("inf"), "Unsuitable"),
+]
+
+
+def _constants(keys=PARAMETER_KEYS):
+    standard = np.array([STANDARDS[k][0] if STANDARDS.get(k) else np.nan for k in keys])
+    ideal = np.array([STANDARDS[k][1] if STANDARDS.get(k) else np.nan for k in keys])
+    inverse = np.where(np.isnan(standard), 0.0, 1.0 / np.nan_to_num(standard, nan=1.0))
+    weights = inverse / inverse.sum()
+    deviation = np.array([k == "ph" for k in keys])
+    return standard, ideal, weights, deviation
+
+
+_STANDARD, _IDEAL, _WEIGHTS, _DEVIATION = _constants()
+
+
+def sub_indices(values):
+    """Quality rating q_i per parameter; values has PARAMETER_KEYS as its last axis."""
+    values = np.asarray(values, dtype=np.float64)
+    q = 100.0 * (values - _IDEAL) / (_STANDARD - _IDEAL)
+    # pH is penalised for moving away from neutral in either direction
+    q[..., _DEVIATION] = np.abs(q[..., _DEVIATION])
+    return q
+
+
+def compute_wqi(values):
+    """WQI for every reading in `values` (..., parameters) -> array of shape (...).
+
+    Missing (NaN) readings are left out and the remaining weights are
+    re-normalised; readings with no scored parameter give NaN.
+    """
+    q = sub_indices(values)
+    present = ~np.isnan(q)
+    score = np.where(present, q, 0.0) @ _WEIGHTS
+    total = present @ _WEIGHTS
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, score / total, np.nan)
+
+
+def category(score):
+    if score is None or score != score:
+        return "--"
+    for limit, name in CATEGORIES:
+        if score <= limit:
+            return name
+    return CATEGORIES[-1][1]
@@ -0,0 +1,79 @@
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+
+SECONDS_PER_DAY = 86400
+
+# Forecast entries bucketed by local day number, (epoch + utc offset) // 86400.
+# Integer days sort correctly and never collide across years, unlike "%b %d"
+# keys, and each day's hourly epochs stay sorted so "from now on" is a bisect.
+
+
+def local_day(epoch, tz_offset):
+    return (int(epoch) + tz_offset) // SECONDS_PER_DAY
+
+
+def clock(epoch, tz_offset):
+    seconds = (int(epoch) + tz_offset) % SECONDS_PER_DAY
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+
+class ForecastModel:
+    def __init__(self):
+        self.tz_offset = 0
+        self.days = []          # sorted local day numbers with a daily entry
+        self.daily = {}         # day -> card info
+        self.epochs = {}        # day -> sorted epochs of the hourly entries
+        self.entries = {}       # day -> hourly API entries, in epoch order
+
+    def build(self, daily_list, hourly_list, tz_offset=0):
+        self.tz_offset = tz_offset
+        self.daily = {}
+        for entry in daily_list:
+            day = local_day(entry["dt"], tz_offset)
+            # Only one strftime per day, for the labels on its card
+            date = datetime.fromtimestamp(day * SECONDS_PER_DAY, tz=timezone.utc)
+            self.daily[day] = {
+                "day": day,
+                "label": date.strftime("%b %d"),
+                "weekday": date.strftime("%A"),
+                "temp": round(entry["temp"]["day"]),
+                "summary": entry["weather"][0]["main"],
+            }
+        self.days = sorted(self.daily)
+
+        # Hourly feeds arrive in time order; sort only if one does not
+        if any(a["dt"] > b["dt"] for a, b in zip(hourly_list, hourly_list[1:])):
+            hourly_list = sorted(hourly_list, key=lambda h: h["dt"])
+        self.epochs, self.entries = {}, {}
+        for entry in hourly_list:
+            day = local_day(entry["dt"], tz_offset)
+            if day in self.daily:
+                self.epochs.setdefault(day, []).append(entry["dt"])
+                self.entries.setdefault(day, []).append(entry)
+
+    def today(self, now=None):
+        return local_day(time.time() if now is None else now, self.tz_offset)
+
+    def start_index(self, day, now=None):
+        """First hourly entry of the day at or after now; the whole day if none is left."""
+        epochs = self.epochs.get(day, [])
+        index = bisect_left(epochs, time.time() if now is None else now)
+        return index if index < len(epochs) else 0
+
+    def hours(self, day, count, now=None):
+        """Display rows for up to `count` hours of the day, starting from now."""
+        start = self.start_index(day, now)
+        rows = []
+        for h in self.entries.get(day, [])[start:start + count]:
+            rows.append({
+                "time": clock(h["dt"], self.tz_offset),
+                "temp": round(h["main"]["temp"]),
+                "status": h["weather"][0]["main"],
+                "humidity": h["main"]["humidity"],
+                "pressure": h["main"]["pressure"],
+                "wind_speed": h["wind"]["speed"],
+                "wind_deg": h["wind"]["deg"],
+                "gust": h["wind"].get("gust", 0),
+            })
+        return rows
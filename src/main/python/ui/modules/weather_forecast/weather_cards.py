@@ -0,0 +1,123 @@
+from PyQt5.QtWidgets import QPushButton, QFrame, QLabel, QVBoxLayout, QHBoxLayout
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt, pyqtSignal
+
+# Forecast cards are created once and then only have their text and enabled
+# state changed, so refreshes and day switches allocate no widgets. Styles
+# live on the containers (see DAILY_STYLE / HOURLY_STYLE) and are parsed once.
+
+DAILY_STYLE = """
+    QPushButton#dailyCard {
+        background-color: #fff;
+        border-radius: 10px;
+        border: 2px solid #42a5f5;
+    }
+    QPushButton#dailyCard:hover {
+        background-color: #f9fafb;
+    }
+    QPushButton#dailyCard:disabled {
+        background-color: #f9fafb;
+        border: 2px solid #aaa;
+        color: #999;
+    }
+"""
+
+HOURLY_STYLE = """
+    QFrame#hourlyCard {
+        background-color: white;
+        border: 1px solid #e5e7eb;
+        border-radius: 10px;
+    }
+"""
+
+
+def set_text(label, text):
+    # QLabel.setText re-lays out even for identical text
+    if label.text() != text:
+        label.setText(text)
+
+
+class DailyCard(QPushButton):
+    day_selected = pyqtSignal(int)   # local day number, see forecast_model
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("dailyCard")
+        self.setFixedSize(150, 200)
+        self.day = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(5, 5, 5, 5)
+        self.lbl_day = self._label(QFont("Arial", 12, QFont.Bold))
+        self.lbl_date = self._label(QFont("Arial", 12, QFont.Bold))
+        self.lbl_status = self._label(QFont("Arial", 10, QFont.Bold))
+        self.lbl_temp = self._label(QFont("Arial", 10, QFont.Bold))
+        for label in (self.lbl_day, self.lbl_date, self.lbl_status, self.lbl_temp):
+            layout.addWidget(label)
+
+        self.clicked.connect(lambda checked=False: self.day_selected.emit(self.day))
+
+    def _label(self, font):
+        label = QLabel()
+        label.setFont(font)
+        label.setAlignment(Qt.AlignCenter)
+        return label
+
+    def update_day(self, info, icon, enabled):
+        self.day = info["day"]
+        set_text(self.lbl_day, info["weekday"])
+        set_text(self.lbl_date, info["label"])
+        set_text(self.lbl_status, f"{icon}\n{info['summary']}")
+        set_text(self.lbl_temp, f"{info['temp']}°C")
+        if self.isEnabled() != enabled:
+            self.setEnabled(enabled)
+
+
+class HourlyCard(QFrame):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("hourlyCard")
+
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(20)
+        font = QFont("Arial", 10)
+        self.labels = []
+        for _ in range(8):   # time, temp, humidity, pressure, wind, direction, gust, status
+            label = QLabel()
+            label.setFont(font)
+            layout.addWidget(label)
+            self.labels.append(label)
+
+    def update_hour(self, hour, emoji):
+        texts = (
+            f"🕒 {hour['time']}",
+            f"🌡️ {hour['temp']} °C",
+            f"💧 {hour['humidity']}%",
+            f"{hour['pressure']} hPa",
+            f"{hour['wind_speed']} km/h",
+            f"{hour['wind_deg']}° angle",
+            f"{hour['gust']} km/h",
+            f"{emoji} {hour['status']}",
+        )
+        for label, text in zip(self.labels, texts):
+            set_text(label, text)
+
+
+class CardPool:
+    """Fixed set of cards in a layout; grows on demand, hides what is not used."""
+
+    def __init__(self, layout, factory):
+        self.layout = layout
+        self.factory = factory
+        self.cards = []
+
+    def take(self, count):
+        while len(self.cards) < count:
+            card = self.factory()
+            self.layout.addWidget(card)
+            self.cards.append(card)
+        for i, card in enumerate(self.cards):
+            if card.isHidden() != (i >= count):
+                card.setHidden(i >= count)
+        return self.cards[:count]
@@ -0,0 +1,195 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# Threshold alerts for sensor and API readings.
+#
+# A rule is a small dict; exactly one of above / below / outside sets the limit:
+#
+#   {"id": "ph-range", "metric": "ph", "outside": [6.5, 8.5],
+#    "hysteresis": 0.1, "debounce": 3, "severity": "warning"}
+#
+#   hysteresis  how far back inside the limit a value must come to clear the alert
+#   debounce    consecutive breaching readings (per station) before it is raised
+#
+# Rules are compiled per set of metric columns into arrays, and a batch of
+# readings is evaluated for every rule and station at once.
+
+RULES_FILE = "src/main/python/ui/alert_rules.json"   # optional override of DEFAULT_RULES
+SEVERITIES = ("info", "warning", "critical")
+
+DEFAULT_RULES = [
+    # Water (BIS 10500 drinking-water limits)
+    {"id": "ph-range", "metric": "ph", "outside": [6.5, 8.5], "hysteresis": 0.1, "debounce": 3,
+     "severity": "warning", "message": "pH outside 6.5–8.5"},
+    {"id": "do-low", "metric": "do", "below": 5.0, "hysteresis": 0.3, "debounce": 3,
+     "severity": "warning", "message": "Dissolved oxygen below 5 mg/L"},
+    {"id": "turbidity-spike", "metric": "turbidity", "above": 50.0, "hysteresis": 5.0, "debounce": 1,
+     "severity": "critical", "message": "Turbidity spike above 50 NTU"},
+    {"id": "tds-high", "metric": "tds", "above": 2000.0, "hysteresis": 50.0, "debounce": 3,
+     "severity": "warning", "message": "TDS above 2000 mg/L"},
+    # Air (NAAQS 24-hour standards, µg/m³)
+    {"id": "pm2_5-naaqs", "metric": "pm2_5", "above": 60.0, "hysteresis": 5.0,
+     "severity": "warning", "message": "PM2.5 above the national standard (60 µg/m³)"},
+    {"id": "pm10-naaqs", "metric": "pm10", "above": 100.0, "hysteresis": 10.0,
+     "severity": "warning", "message": "PM10 above the national standard (100 µg/m³)"},
+    {"id": "so2-naaqs", "metric": "so2", "above": 80.0, "hysteresis": 5.0,
+     "severity": "warning", "message": "SO2 above the national standard (80 µg/m³)"},
+    {"id": "no2-naaqs", "metric": "no2", "above": 80.0, "hysteresis": 5.0,
+     "severity": "warning", "message": "NO2 above the national standard (80 µg/m³)"},
+]
+
+
+class Alert:
+    __slots__ = ("rule_id", "metric", "station", "ts", "value", "severity", "message", "raised")
+
+    def __init__(self, rule_id, metric, station, ts, value, severity, message, raised):
+        self.rule_id = rule_id
+        self.metric = metric
+        self.station = station
+        self.ts = ts
+        self.value = value
+        self.severity = severity
+        self.message = message
+        self.raised = raised    # False when the alert clears
+
+    def __repr__(self):
+        state = "raised" if self.raised else "cleared"
+        return f"Alert({self.rule_id}, station={self.station}, {state}, value={self.value:.2f})"
+
+
+def load_rules(path=RULES_FILE):
+    if not os.path.exists(path):
+        return list(DEFAULT_RULES)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print("[Alert Rules] using defaults:", e)
+        return list(DEFAULT_RULES)
+
+
+def _limits(rule):
+    if "outside" in rule:
+        low, high = rule["outside"]
+        return float(low), float(high)
+    if "above" in rule:
+        return -np.inf, float(rule["above"])
+    if "below" in rule:
+        return float(rule["below"]), np.inf
+    raise ValueError(f"rule {rule.get('id')!r} needs one of above, below or outside")
+
+
+class RuleEngine:
+    """Compiled rules over a fixed set of metric columns, with per-station state.
+
+    Rules for metrics outside `metrics` are ignored, so the same rule list
+    can back the water page (PARAMETER_KEYS) and the air page (components).
+    """
+
+    def __init__(self, rules, metrics):
+        self.metrics = tuple(metrics)
+        self.rules = [r for r in rules if r["metric"] in self.metrics]
+        for rule in self.rules:
+            if rule.get("severity", "warning") not in SEVERITIES:
+                raise ValueError(f"rule {rule['id']!r}: unknown severity {rule['severity']!r}")
+
+        self.columns = np.array([self.metrics.index(r["metric"]) for r in self.rules], dtype=np.intp)
+        limits = np.array([_limits(r) for r in self.rules], dtype=np.float64).reshape(-1, 2)
+        self.low, self.high = limits[:, 0], limits[:, 1]
+        hysteresis = np.array([float(r.get("hysteresis", 0.0)) for r in self.rules])
+        # Same precision as the readings, so comparisons run without upcasting
+        self.clear_low = (self.low + hysteresis).astype(np.float32)
+        self.clear_high = (self.high - hysteresis).astype(np.float32)
+        self.low, self.high = self.low.astype(np.float32), self.high.astype(np.float32)
+        self.debounce = np.array([max(int(r.get("debounce", 1)), 1) for r in self.rules], dtype=np.int32)
+
+        self.slots = {}                                        # station -> state row
+        self.active = np.zeros((0, len(self.rules)), dtype=bool)
+        self.streak = np.zeros((0, len(self.rules)), dtype=np.int32)   # consecutive breaches
+
+    def _slots_for(self, stations):
+        new = [int(s) for s in np.unique(stations) if int(s) not in self.slots]
+        if new:
+            for station in new:
+                self.slots[station] = len(self.slots)
+            grow = len(new)
+            self.active = np.vstack([self.active, np.zeros((grow, len(self.rules)), dtype=bool)])
+            self.streak = np.vstack([self.streak, np.zeros((grow, len(self.rules)), dtype=np.int32)])
+        lookup = np.fromiter(self.slots.keys(), dtype=np.int64), np.fromiter(self.slots.values(), dtype=np.int64)
+        order = np.argsort(lookup[0])
+        return lookup[1][order][np.searchsorted(lookup[0][order], stations)]
+
+    def evaluate(self, timestamps, stations, values):
+        """Run every rule over a batch: timestamps (n,), stations (n,), values (n, metrics).
+        Returns the alerts raised or cleared by this batch, in time order per station."""
+        n = len(timestamps)
+        if n == 0 or not self.rules:
+            return []
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        stations = np.asarray(stations, dtype=np.int64)
+        slots = self._slots_for(stations)
+
+        # Group readings by station, keeping arrival order inside each group
+        order = np.argsort(slots, kind="stable")
+        slots, ts, stations = slots[order], timestamps[order], stations[order]
+        values = np.asarray(values, dtype=np.float32)[order]
+
+        # Rules that neither breach in this batch nor carry state cannot change; skip them
+        x = values[:, self.columns].T                                        # (rules, n)
+        breach = (x < self.low[:, None]) | (x > self.high[:, None])
+        live = breach.any(axis=1) | self.active.any(axis=0) | self.streak.any(axis=0)
+        if not live.any():
+            return []
+        rules = np.flatnonzero(live)
+        x, breach = x[rules], breach[rules]
+        inside = (x > self.clear_low[rules, None]) & (x < self.clear_high[rules, None])   # NaN is neither
+
+        idx = np.arange(n, dtype=np.int32)
+        first = np.r_[True, slots[1:] != slots[:-1]]
+        seg_start = np.maximum.accumulate(np.where(first, idx, 0))
+        carried_active = self.active[slots][:, rules].T
+        carried_streak = self.streak[slots][:, rules].T
+
+        # Length of the breaching run ending at each reading, continuing the stored streak
+        last_ok = np.maximum.accumulate(np.where(breach, -1, idx), axis=1)
+        run = np.where(last_ok >= seg_start, idx - last_ok, idx - seg_start + 1 + carried_streak)
+        raise_at = breach & (run >= self.debounce[rules, None])
+
+        # Alert state is that of the latest raise/clear event, else the stored state
+        event = np.maximum.accumulate(np.where(raise_at | inside, idx, -1), axis=1)
+        state = np.where(event >= seg_start,
+                         np.take_along_axis(raise_at, np.maximum(event, 0), axis=1), carried_active)
+        previous = np.where(first, carried_active, np.concatenate([state[:, :1], state[:, :-1]], axis=1))
+
+        last = np.r_[first[1:], True]
+        self.active[np.ix_(slots[last], rules)] = state[:, last].T
+        self.streak[np.ix_(slots[last], rules)] = np.where(breach[:, last], run[:, last], 0).T
+
+        alerts = []
+        for k, row in zip(*np.nonzero(state != previous)):
+            spec = self.rules[rules[k]]
+            alerts.append(Alert(spec["id"], spec["metric"], int(stations[row]), float(ts[row]), float(x[k, row]),
+                                spec.get("severity", "warning"), spec.get("message", spec["id"]),
+                                bool(state[k, row])))
+        alerts.sort(key=lambda a: a.ts)
+        return alerts
+
+    def evaluate_one(self, values, station=0, ts=None):
+        """Single reading given as a mapping metric -> value (missing metrics are skipped)."""
+        row = np.array([[float(values[m]) if isinstance(values.get(m), (int, float)) else np.nan
+                         for m in self.metrics]])
+        return self.evaluate([time.time() if ts is None else ts], [station], row)
+
+    def active_rules(self, station=0):
+        slot = self.slots.get(station)
+        if slot is None:
+            return []
+        return [self.rules[i] for i in np.flatnonzero(self.active[slot])]
+
+    def reset(self):
+        self.slots = {}
+        self.active = self.active[:0]
+        self.streak = self.streak[:0]
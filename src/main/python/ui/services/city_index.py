@@ -0,0 +1,179 @@
+import json
+import os
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from PyQt5.QtCore import QObject, Qt, QStringListModel, pyqtSignal
+from PyQt5.QtWidgets import QCompleter
+
+CITY_FILE = "src/main/python/ui/location.json"
+MAX_FUZZY_DISTANCE = 2
+
+
+def edit_distance(a, b, limit):
+    """Edit distance counting swapped neighbours as one typo; stops past limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def allowed_distance(text):
+    """Typos tolerated in a query: none below 4 characters, one below 8, then MAX_FUZZY_DISTANCE."""
+    if len(text) < 4:
+        return 0
+    return 1 if len(text) < 8 else MAX_FUZZY_DISTANCE
+
+
+class CityIndexSignals(QObject):
+    names_changed = pyqtSignal(list)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CityIndex:
+    """In-memory gazetteer built from the "cities" section of location.json.
+
+    Names are kept in one sorted list: exact lookups go through a dict and
+    prefix lookups are a bisection plus a short scan, which gives the same O(log n + k)
+    bound as a trie without a node object per character. The trigram
+    index for typo-tolerant lookups is only built on the first fuzzy query.
+    The file is re-parsed only when its mtime changes.
+    """
+
+    def __init__(self, path=CITY_FILE):
+        self.path = path
+        self.mtime = None
+        self.cities = {}
+        self.names = []
+        self._trigrams = None
+        self._model = None
+        self._lock = threading.RLock()
+        # refresh() may run on a pool thread; the completer model is updated through a queued signal
+        self.signals = CityIndexSignals()
+
+    def refresh(self):
+        """Reload the file if it changed on disk; returns True when reloaded."""
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return False
+        with self._lock:
+            if mtime == self.mtime:
+                return False
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.cities = {k.lower(): v for k, v in data.get("cities", {}).items()}
+            self.names = sorted(self.cities)
+            self._trigrams = None
+            self.mtime = mtime
+            self.signals.names_changed.emit(list(self.names))
+            return True
+
+    def exact(self, name):
+        self.refresh()
+        key = name.strip().lower()
+        city = self.cities.get(key)
+        return self._result(key, city) if city else None
+
+    def prefix(self, text, limit=20):
+        self.refresh()
+        text = text.strip().lower()
+        start = bisect_left(self.names, text)
+        matches = []
+        for name in self.names[start:start + limit]:
+            if not name.startswith(text):
+                break
+            matches.append(name)
+        return matches
+
+    def fuzzy(self, text, limit=5, max_distance=None):
+        self.refresh()
+        text = text.strip().lower()
+        if max_distance is None:
+            max_distance = allowed_distance(text)
+        if not text or max_distance == 0:
+            return []
+        with self._lock:
+            if self._trigrams is None:
+                self._build_trigrams()
+            index = self._trigrams
+            names = self.names
+
+        # Only names sharing enough trigrams with the query get a full edit-distance check
+        grams = trigrams(text)
+        counts = defaultdict(int)
+        for gram in grams:
+            for i in index.get(gram, ()):
+                counts[i] += 1
+        needed = max(1, len(grams) - 3 * max_distance)
+        candidates = sorted((i for i, c in counts.items() if c >= needed), key=lambda i: -counts[i])
+
+        # Ties on distance go to names keeping the first letter, then to more shared trigrams
+        scored = []
+        for i in candidates[:500]:
+            distance = edit_distance(text, names[i], max_distance)
+            if distance <= max_distance:
+                scored.append((distance, names[i][0] != text[0], -counts[i], names[i]))
+        scored.sort()
+        return [entry[-1] for entry in scored[:limit]]
+
+    def lookup(self, text):
+        """Exact match first, then the closest fuzzy match; None if nothing is close.
+        A fuzzy match is only taken when it keeps the first letter, so an unrelated
+        word is reported as not found instead of loading some other city."""
+        result = self.exact(text)
+        if result is None:
+            text = text.strip().lower()
+            matches = self.fuzzy(text, limit=1)
+            if matches and matches[0][0] == text[0]:
+                result = self.exact(matches[0])
+        return result
+
+    def completer(self, parent=None):
+        # Names are already sorted, so QCompleter can binary-search instead of scanning
+        self.refresh()
+        if self._model is None:
+            self._model = QStringListModel(self.names)
+            self.signals.names_changed.connect(self._model.setStringList)
+        completer = QCompleter(self._model, parent)
+        completer.setCaseSensitivity(Qt.CaseInsensitive)
+        completer.setModelSorting(QCompleter.CaseInsensitivelySortedModel)
+        return completer
+
+    def _build_trigrams(self):
+        index = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for gram in trigrams(name):
+                index[gram].append(i)
+        self._trigrams = dict(index)
+
+    def _result(self, name, city):
+        return {"name": name, "lat": city["lat"], "lon": city["lon"]}
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_city_index():
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = CityIndex()
+    return _index
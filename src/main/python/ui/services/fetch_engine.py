@@ -0,0 +1,123 @@
+from collections import deque
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from ui.services import http_client, quota
+from ui.services.io_pool import io_pool
+
+
+class FetchSignals(QObject):
+    # generation, tag, payload / error message
+    finished = pyqtSignal(int, str, object)
+    failed = pyqtSignal(int, str, str)
+
+
+class FetchWorker(QRunnable):
+    def __init__(self, generation, tag, url, timeout=None, priority=quota.URGENT):
+        super().__init__()
+        self.generation = generation
+        self.tag = tag
+        self.url = url
+        self.timeout = timeout
+        self.priority = priority
+        self.signals = FetchSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            data = http_client.get_json(self.url, timeout=self.timeout, priority=self.priority)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, self.tag, str(e))
+            return
+        self.signals.finished.emit(self.generation, self.tag, data)
+
+
+class FetchEngine(QObject):
+    """Runs a group of GET requests concurrently on the shared I/O pool.
+
+    Every call to submit() starts a new generation: requests of older
+    generations still waiting in the pool are cancelled and results of
+    the ones already running are discarded, so a slow answer for a
+    previous search can never overwrite the current one.
+
+    With max_in_flight set, at most that many of this engine's requests
+    occupy pool threads at once and the rest wait in a local queue.
+    """
+
+    result_ready = pyqtSignal(str, object)   # tag, json payload
+    request_failed = pyqtSignal(str, str)    # tag, error message
+    batch_finished = pyqtSignal(dict, dict)  # {tag: payload}, {tag: error}
+
+    def __init__(self, parent=None, pool=None, timeout=None, max_in_flight=None):
+        super().__init__(parent)
+        self.pool = pool or io_pool()
+        self.timeout = timeout
+        self.max_in_flight = max_in_flight
+        self.generation = 0
+        self._workers = {}
+        self._queued = deque()
+        self._running = set()
+        self._results = {}
+        self._errors = {}
+
+    def submit(self, urls, priority=quota.URGENT):
+        """Fetch every {tag: url} in parallel, superseding older requests.
+        Background refreshes pass quota.BACKGROUND so user actions go first."""
+        self.cancel()
+        self.generation += 1
+        self._results = {}
+        self._errors = {}
+        for tag, url in urls.items():
+            worker = FetchWorker(self.generation, tag, url, self.timeout, priority)
+            worker.setAutoDelete(False)
+            worker.signals.finished.connect(self._on_finished)
+            worker.signals.failed.connect(self._on_failed)
+            self._workers[(self.generation, tag)] = worker
+            self._queued.append((self.generation, tag))
+        if not urls:
+            # Nothing will come back to finish the batch, so report it done now
+            self.batch_finished.emit({}, {})
+            return self.generation
+        self._start_queued()
+        return self.generation
+
+    def cancel(self):
+        """Drop queued requests; running ones are ignored when they return."""
+        for key in self._queued:
+            self._workers.pop(key, None)
+        self._queued.clear()
+        for key in list(self._running):
+            if self.pool.tryTake(self._workers[key]):
+                self._running.discard(key)
+                del self._workers[key]
+
+    def _start_queued(self):
+        while self._queued and (self.max_in_flight is None or len(self._running) < self.max_in_flight):
+            key = self._queued.popleft()
+            self._running.add(key)
+            self.pool.start(self._workers[key])
+
+    def is_busy(self):
+        return any(gen == self.generation for gen, _ in self._workers)
+
+    def _release(self, generation, tag):
+        self._workers.pop((generation, tag), None)
+        self._running.discard((generation, tag))
+        self._start_queued()
+        return generation == self.generation
+
+    def _check_batch(self):
+        if not self.is_busy():
+            self.batch_finished.emit(self._results, self._errors)
+
+    def _on_finished(self, generation, tag, data):
+        if self._release(generation, tag):
+            self._results[tag] = data
+            self.result_ready.emit(tag, data)
+            self._check_batch()
+
+    def _on_failed(self, generation, tag, message):
+        if self._release(generation, tag):
+            self._errors[tag] = message
+            self.request_failed.emit(tag, message)
+            self._check_batch()
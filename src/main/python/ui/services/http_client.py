@@ -0,0 +1,108 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ui.services import quota
+from ui.services.response_cache import ResponseCache, normalize_key
+
+# Shared HTTP client used by every module. A single requests.Session keeps
+# connections to api.openweathermap.org alive between refreshes instead of
+# paying a new TCP + TLS handshake on every call.
+
+DEFAULT_TIMEOUT = (5, 15)     # (connect, read) seconds
+MAX_CONNECTIONS_PER_HOST = 8  # pooled sockets kept per host
+MAX_HOSTS = 10                # distinct hosts kept in the pool
+RETRIES = 3
+BACKOFF_FACTOR = 0.5          # sleeps 0.5s, 1s, 2s between retries
+# 429 is not retried here: a re-send would skip the quota, so the limiter backs off instead
+RETRY_STATUSES = (500, 502, 503, 504)
+
+_config = {
+    "timeout": DEFAULT_TIMEOUT,
+    "max_per_host": MAX_CONNECTIONS_PER_HOST,
+    "retries": RETRIES,
+    "backoff_factor": BACKOFF_FACTOR,
+}
+_session = None
+_lock = threading.Lock()
+
+cache = ResponseCache()
+
+
+def _build_session():
+    retry = Retry(
+        total=_config["retries"],
+        backoff_factor=_config["backoff_factor"],
+        status_forcelist=RETRY_STATUSES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    # pool_block keeps us from opening more than max_per_host sockets per host
+    adapter = HTTPAdapter(
+        pool_connections=MAX_HOSTS,
+        pool_maxsize=_config["max_per_host"],
+        pool_block=True,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "EMCS/1.0", "Accept": "application/json"})
+    return session
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def configure(timeout=None, max_per_host=None, retries=None, backoff_factor=None):
+    """Change client settings; the pool is rebuilt on next use."""
+    global _session
+    with _lock:
+        if timeout is not None:
+            _config["timeout"] = timeout
+        if max_per_host is not None:
+            _config["max_per_host"] = max_per_host
+        if retries is not None:
+            _config["retries"] = retries
+        if backoff_factor is not None:
+            _config["backoff_factor"] = backoff_factor
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get(url, params=None, timeout=None, priority=quota.URGENT, **kwargs):
+    # Waits for a slot in the shared API quota; raises quota.QuotaExceeded if none comes in time
+    quota.manager.acquire(url, priority)
+    res = get_session().get(url, params=params, timeout=timeout or _config["timeout"], **kwargs)
+    quota.manager.note_response(url, res.status_code, res.headers.get("Retry-After"))
+    return res
+
+
+def get_json(url, params=None, timeout=None, use_cache=True, priority=quota.URGENT):
+    """GET and decode JSON, served from the shared response cache when fresh.
+    Only cache misses count against the API quota."""
+    if not use_cache:
+        return get(url, params=params, timeout=timeout, priority=priority).json()
+
+    def fetch():
+        res = get(url, params=params, timeout=timeout, priority=priority)
+        return res.json(), len(res.content), res.status_code == 200
+
+    return cache.get_or_fetch(normalize_key(url, params), fetch)
+
+
+def close():
+    global _session
+    with _lock:
+        if _session is not None:
+            _session.close()
+            _session = None
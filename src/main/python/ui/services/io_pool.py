@@ -0,0 +1,18 @@
+from PyQt5.QtCore import QThreadPool
+
+# All network work (blocking requests, urllib3 retry back-off, quota waits)
+# runs on this pool. Qt uses QThreadPool.globalInstance() internally, e.g. for
+# the smooth image scaling behind QIcon.pixmap, so a global pool full of
+# sleeping requests can stall the GUI thread.
+
+MAX_IO_THREADS = 16
+_pool = None
+
+
+def io_pool():
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(MAX_IO_THREADS)
+        _pool.setExpiryTimeout(60 * 1000)
+    return _pool
@@ -0,0 +1,148 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal, pyqtSlot
+
+from ui.services import http_client
+from ui.services.io_pool import io_pool
+
+# The resolved location has a file of its own: rewriting the city gazetteer on
+# every lookup would make the city index re-parse it
+LOCATION_FILE = "src/main/python/ui/current_location.json"
+GAZETTEER_FILE = "src/main/python/ui/location.json"   # older versions kept "current" here
+IP_LOOKUP_URL = "https://ipinfo.io/json"
+LOCATION_TTL = 24 * 60 * 60   # re-resolve the IP location once a day
+DEFAULT_LOCATION = {"city": "Kolkata", "lat": 22.5726, "lon": 88.3639, "source": "default"}
+
+
+def read_location_file(path=LOCATION_FILE):
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_location_file(data, path=LOCATION_FILE):
+    # Write to a temp file next to the target and rename, so a crash never leaves half a file
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def parse_location(entry):
+    try:
+        return {
+            "city": entry.get("city") or DEFAULT_LOCATION["city"],
+            "lat": float(entry["lat"]),
+            "lon": float(entry["lon"]),
+            "source": entry.get("source", "unknown"),
+            "resolved_at": float(entry.get("resolved_at", 0)),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class ResolverSignals(QObject):
+    resolved = pyqtSignal(dict)
+    failed = pyqtSignal(str)
+
+
+class LocationResolver(QRunnable):
+    """Looks the IP location up and persists it, all off the GUI thread."""
+
+    def __init__(self, path=LOCATION_FILE):
+        super().__init__()
+        self.path = path
+        self.signals = ResolverSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            data = http_client.get_json(IP_LOOKUP_URL, use_cache=False)
+            lat, lon = data["loc"].split(",")
+            location = {
+                "city": data.get("city", DEFAULT_LOCATION["city"]),
+                "lat": lat,
+                "lon": lon,
+                "source": "system-ip",
+                "resolved_at": time.time(),
+            }
+            loc_data = read_location_file(self.path)
+            loc_data["current"] = location
+            write_location_file(loc_data, self.path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.resolved.emit(parse_location(location))
+
+
+class LocationService(QObject):
+    """Single source of the device location for every page.
+
+    The location stored in current_location.json is published straight away; a
+    background IP lookup only runs when it is missing or older than the TTL.
+    """
+
+    location_changed = pyqtSignal(float, float, str)   # lat, lon, city
+    resolve_failed = pyqtSignal(str)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        # Call it first from the GUI thread: the service receives its resolver's signals there
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, path=LOCATION_FILE, ttl=LOCATION_TTL):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self._resolver = None
+        stored = read_location_file(path) if os.path.exists(path) else read_location_file(GAZETTEER_FILE)
+        self.location = parse_location(stored.get("current", {}))
+
+    def current(self):
+        location = self.location or DEFAULT_LOCATION
+        return location["lat"], location["lon"], location["city"]
+
+    def is_fresh(self):
+        return bool(self.location) and time.time() - self.location["resolved_at"] < self.ttl
+
+    def is_resolving(self):
+        return self._resolver is not None
+
+    def resolve(self, force=False):
+        """Start a background lookup unless the stored location is still fresh."""
+        if self._resolver is not None or (self.is_fresh() and not force):
+            return False
+        self._resolver = LocationResolver(self.path)
+        self._resolver.setAutoDelete(False)
+        self._resolver.signals.resolved.connect(self._on_resolved)
+        self._resolver.signals.failed.connect(self._on_failed)
+        io_pool().start(self._resolver)
+        return True
+
+    def _on_resolved(self, location):
+        self._resolver = None
+        self.location = location
+        print(f"[Auto IP Location] {location['city']}: {location['lat']}, {location['lon']}")
+        self.location_changed.emit(location["lat"], location["lon"], location["city"])
+
+    def _on_failed(self, message):
+        self._resolver = None
+        print("[Auto Location IP Error]", message)
+        self.resolve_failed.emit(message)
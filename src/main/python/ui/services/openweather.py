@@ -0,0 +1,19 @@
+# OpenWeather endpoints shared by the air and weather modules
+
+API_KEY = "your api key"  # Replace with your actual OpenWeather API key
+
+
+def current_weather_url(lat, lon, api_key=API_KEY):
+    return f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric"
+
+
+def air_pollution_url(lat, lon, api_key=API_KEY):
+    return f"http://api.openweathermap.org/data/2.5/air_pollution?lat={lat}&lon={lon}&appid={api_key}"
+
+
+def hourly_forecast_url(lat, lon, api_key=API_KEY):
+    return f"https://pro.openweathermap.org/data/2.5/forecast/hourly?lat={lat}&lon={lon}&appid={api_key}&units=metric"
+
+
+def daily_forecast_url(lat, lon, days=7, api_key=API_KEY):
+    return f"https://api.openweathermap.org/data/2.5/forecast/daily?lat={lat}&lon={lon}&cnt={days}&appid={api_key}&units=metric"
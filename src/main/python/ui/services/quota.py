@@ -0,0 +1,173 @@
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+# Client-side rate limiting for the shared OpenWeather key. Every request
+# path (JSON fetches in http_client, map tiles in the web view) takes a token
+# from the buckets of its endpoint class before going out, so the app as a
+# whole stays inside the plan instead of each page counting on its own.
+#
+# Urgent requests are the ones a user is waiting for (a search, a page being
+# opened); background refreshes wait behind them and may not dig into the
+# last BACKGROUND_RESERVE of any bucket.
+
+URGENT = 0
+BACKGROUND = 1
+PRIORITY_NAMES = {URGENT: "urgent", BACKGROUND: "background"}
+
+# host -> endpoint class; hosts not listed are not limited (e.g. ipinfo.io)
+ENDPOINT_CLASSES = {
+    "api.openweathermap.org": "api",
+    "pro.openweathermap.org": "pro",
+    "maps.openweathermap.org": "maps",
+    "tile.openweathermap.org": "maps",
+}
+
+# Calls per minute / per day for each class; set these to your subscription
+QUOTAS = {
+    "api": {"minute": 60, "day": 30_000},
+    "pro": {"minute": 30, "day": 10_000},
+    "maps": {"minute": 600, "day": 100_000},
+}
+PERIODS = {"minute": 60, "day": 24 * 60 * 60}
+BACKGROUND_RESERVE = 0.2
+BACKGROUND_TIMEOUT = 30.0      # seconds a refresh may wait for a token before giving up
+URGENT_TIMEOUT = 10.0
+THROTTLE_SECONDS = 60.0        # pause after a 429 that carries no usable Retry-After
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+def endpoint_class(url):
+    return ENDPOINT_CLASSES.get(urlsplit(url).hostname or "")
+
+
+class TokenBucket:
+    """`capacity` tokens refilled evenly over `period` seconds."""
+
+    def __init__(self, capacity, period):
+        self.capacity = float(capacity)
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now, reserve=0.0):
+        """Seconds until one token is available above `reserve` (a fraction of capacity)."""
+        self._refill(now)
+        floor = reserve * self.capacity
+        missing = floor + 1.0 - self.tokens
+        return 0.0 if missing <= 0 else missing / self.rate
+
+    def take(self):
+        self.tokens -= 1.0
+
+
+class QuotaManager:
+    def __init__(self, quotas=QUOTAS):
+        self.buckets = {
+            name: {period: TokenBucket(limit, PERIODS[period]) for period, limit in limits.items()}
+            for name, limits in quotas.items()
+        }
+        self.granted = defaultdict(lambda: [0, 0])     # class -> per priority
+        self.delayed = defaultdict(int)                # had to wait for a token
+        self.rejected = defaultdict(lambda: [0, 0])
+        self.server_throttled = defaultdict(int)       # 429 answers despite the limits
+        self.throttled_until = defaultdict(float)      # class -> monotonic time the server asked us to wait for
+        self._urgent_waiting = defaultdict(int)
+        self._cond = threading.Condition()
+
+    def acquire(self, url, priority=BACKGROUND, timeout=None):
+        """Block until the request may go out; raises QuotaExceeded after `timeout` seconds."""
+        name = endpoint_class(url)
+        if name not in self.buckets:
+            return
+        if timeout is None:
+            timeout = URGENT_TIMEOUT if priority == URGENT else BACKGROUND_TIMEOUT
+        deadline = time.monotonic() + timeout
+        reserve = 0.0 if priority == URGENT else BACKGROUND_RESERVE
+
+        with self._cond:
+            if priority == URGENT:
+                self._urgent_waiting[name] += 1
+            try:
+                waited = False
+                while True:
+                    now = time.monotonic()
+                    if priority == BACKGROUND and self._urgent_waiting[name]:
+                        wait = 0.05      # let the urgent requests through first
+                    else:
+                        wait = max(b.wait_time(now, reserve) for b in self.buckets[name].values())
+                        wait = max(wait, self.throttled_until[name] - now)
+                        if wait == 0.0:
+                            for bucket in self.buckets[name].values():
+                                bucket.take()
+                            self.granted[name][priority] += 1
+                            if waited:
+                                self.delayed[name] += 1
+                            return
+                    if now + wait > deadline:
+                        self.rejected[name][priority] += 1
+                        raise QuotaExceeded(f"{name} quota exhausted, next slot in {wait:.0f}s")
+                    waited = True
+                    self._cond.wait(wait)
+            finally:
+                if priority == URGENT:
+                    self._urgent_waiting[name] -= 1
+                    self._cond.notify_all()
+
+    def try_acquire(self, url, priority=URGENT):
+        """Non-blocking variant for callers that cannot wait (e.g. the web view's IO thread)."""
+        try:
+            self.acquire(url, priority, timeout=0.0)
+            return True
+        except QuotaExceeded:
+            return False
+
+    def note_response(self, url, status_code, retry_after=None):
+        """A 429 holds every request of the endpoint class for Retry-After seconds."""
+        if status_code == 429:
+            name = endpoint_class(url)
+            if name:
+                try:
+                    pause = float(retry_after)
+                except (TypeError, ValueError):
+                    pause = THROTTLE_SECONDS    # missing, or given as an HTTP date
+                with self._cond:
+                    self.server_throttled[name] += 1
+                    self.throttled_until[name] = max(self.throttled_until[name], time.monotonic() + pause)
+
+    def usage(self):
+        """Counters and remaining tokens per endpoint class."""
+        now = time.monotonic()
+        with self._cond:
+            report = {}
+            for name, buckets in self.buckets.items():
+                for bucket in buckets.values():
+                    bucket._refill(now)
+                report[name] = {
+                    "remaining": {period: int(b.tokens) for period, b in buckets.items()},
+                    "granted": {PRIORITY_NAMES[p]: n for p, n in enumerate(self.granted[name])},
+                    "rejected": {PRIORITY_NAMES[p]: n for p, n in enumerate(self.rejected[name])},
+                    "delayed": self.delayed[name],
+                    "server_throttled": self.server_throttled[name],
+                }
+            return report
+
+    def summary(self):
+        parts = []
+        for name, u in self.usage().items():
+            sent = sum(u["granted"].values())
+            if sent or sum(u["rejected"].values()):
+                parts.append(f"{name}: {sent} sent ({u['granted']['urgent']} urgent), "
+                             f"{sum(u['rejected'].values())} rejected, {u['remaining']['day']} left today")
+        return "; ".join(parts) or "no OpenWeather calls"
+
+
+manager = QuotaManager()
@@ -0,0 +1,21 @@
+from PyQt5.QtWebEngineCore import QWebEngineUrlRequestInterceptor
+
+from ui.services import quota
+
+
+class TileQuotaInterceptor(QWebEngineUrlRequestInterceptor):
+    """Counts OpenWeather map tile requests against the shared quota and blocks
+    them once the maps budget is spent. Runs on the web engine's IO thread,
+    so it never waits for a token."""
+
+    def interceptRequest(self, info):
+        url = info.requestUrl().toString()
+        if quota.endpoint_class(url) == "maps" and not quota.manager.try_acquire(url, quota.URGENT):
+            info.block(True)
+
+    def install(self, profile):
+        # setUrlRequestInterceptor exists from Qt 5.13; older versions only have the deprecated name
+        if hasattr(profile, "setUrlRequestInterceptor"):
+            profile.setUrlRequestInterceptor(self)
+        else:
+            profile.setRequestInterceptor(self)
@@ -0,0 +1,177 @@
+import random
+import time
+
+from PyQt5.QtCore import QObject, QEvent, QTimer
+
+# One timer for every periodic job in the app. A job belongs to a page widget:
+# while the page is hidden in the stack (or the window is minimized) the job
+# is paused or slowed down, and when the page shows again with stale data it
+# runs straight away. Intervals are jittered so jobs registered together do
+# not keep firing together, and failures back off exponentially.
+
+DEFAULT_JITTER = 0.1          # +/- fraction of the interval
+MAX_BACKOFF_FACTOR = 16       # failed jobs retry at most this many intervals apart
+MIN_DELAY_MS = 5
+
+
+class RefreshJob:
+    def __init__(self, name, callback, interval, widget=None, hidden="pause", hidden_interval=None,
+                 jitter=DEFAULT_JITTER, max_backoff=None, run_now=False, run_when_shown=False, reports=False):
+        self.name = name
+        self.callback = callback
+        self.interval = interval                    # seconds
+        self.widget = widget
+        self.hidden = hidden                        # "pause", "slow" or "run"
+        self.hidden_interval = hidden_interval or interval * 10
+        self.jitter = jitter
+        self.max_backoff = max_backoff or interval * MAX_BACKOFF_FACTOR
+        self.reports = reports                      # outcome arrives later through done()
+        self.run_when_shown = run_when_shown        # first run waits for the widget to be shown
+        self.failures = 0
+        self.last_run = None if run_now or run_when_shown else time.monotonic()
+        self.due = time.monotonic() if run_now else None
+        self.in_flight = False
+        self.started_at = None
+
+    def visible(self):
+        if self.widget is None:
+            return True
+        return self.widget.isVisible() and not self.widget.window().isMinimized()
+
+    def stale(self, now):
+        return self.last_run is None or now - self.last_run >= self.interval
+
+    def next_delay(self):
+        """Seconds until the next run, or None while paused."""
+        if not self.visible():
+            if self.hidden == "pause":
+                return None
+            base = self.hidden_interval if self.hidden == "slow" else self.interval
+        else:
+            base = self.interval
+        if self.failures:
+            base = min(self.interval * 2 ** self.failures, self.max_backoff)
+        return base * (1.0 + random.uniform(-self.jitter, self.jitter))
+
+
+class RefreshScheduler(QObject):
+    _instance = None
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.jobs = {}
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run_due)
+
+    def register(self, name, callback, interval, widget=None, **options):
+        """Run callback every `interval` seconds while `widget` is visible.
+
+        With reports=True the callback only starts the work (e.g. a fetch)
+        and the owner calls done(name, ok) when it completes; otherwise the
+        job is done when the callback returns, and failed if it raised.
+        run_now=True runs it on the next tick; run_when_shown=True runs it
+        as soon as the widget is (or becomes) visible, and not before.
+        """
+        job = RefreshJob(name, callback, interval, widget, **options)
+        self.jobs[name] = job
+        if widget is not None:
+            widget.installEventFilter(self)
+        if job.run_when_shown:
+            job.due = time.monotonic() if job.visible() else None   # otherwise the Show event starts it
+        elif job.due is None:
+            self._schedule(job)
+        self._arm()
+        return job
+
+    def unregister(self, name):
+        job = self.jobs.pop(name, None)
+        if job and job.widget is not None and not any(j.widget is job.widget for j in self.jobs.values()):
+            job.widget.removeEventFilter(self)
+        self._arm()
+
+    def trigger(self, name):
+        """Run a job as soon as possible, e.g. after the user changed its location."""
+        job = self.jobs.get(name)
+        if job:
+            job.due = time.monotonic()
+            self._arm()
+
+    def done(self, name, ok=True):
+        job = self.jobs.get(name)
+        if job is None:
+            return
+        job.in_flight = False
+        job.failures = 0 if ok else job.failures + 1
+        if ok:
+            job.last_run = time.monotonic()
+        else:
+            DEBUG = False
+            if DEBUG:
+                print(f"[Refresh Scheduler] {name} failed {job.failures}x, backing off")
+        self._schedule(job)
+        self._arm()
+
+    def stop(self):
+        self.timer.stop()
+        self.jobs.clear()
+
+    def eventFilter(self, obj, event):
+        if event.type() in (QEvent.Show, QEvent.Hide):
+            now = time.monotonic()
+            for job in self.jobs.values():
+                if job.widget is not obj:
+                    continue
+                if event.type() == QEvent.Show and job.stale(now) and not job.in_flight:
+                    job.due = now      # shown with stale data: refresh right away
+                elif not job.in_flight:
+                    self._schedule(job)   # paused, slowed down or resumed
+            self._arm()
+        return False
+
+    def _schedule(self, job):
+        delay = job.next_delay()
+        if delay is None:
+            job.due = None
+            return
+        now = time.monotonic()
+        # Count from the last successful run, so hiding and re-showing does not postpone it
+        anchor = now if job.failures or job.last_run is None else job.last_run
+        job.due = max(anchor + delay, now)
+
+    def _arm(self):
+        due = [job.due for job in self.jobs.values() if job.due is not None]
+        due += [job.started_at + job.max_backoff for job in self.jobs.values() if job.in_flight]
+        if not due:
+            self.timer.stop()
+            return
+        delay_ms = max(int((min(due) - time.monotonic()) * 1000), MIN_DELAY_MS)
+        self.timer.start(delay_ms)
+
+    def run_due(self):
+        now = time.monotonic()
+        for job in list(self.jobs.values()):
+            if job.in_flight and now - job.started_at > job.max_backoff:
+                job.in_flight = False   # never reported back; count it as a failure
+                job.failures += 1
+                self._schedule(job)
+            if job.due is None or job.due > now or job.in_flight:
+                continue
+            job.in_flight = True
+            job.started_at = now
+            job.due = None
+            try:
+                job.callback()
+                ok = True
+            except Exception as e:
+                print(f"[Refresh Scheduler] {job.name}:", e)
+                ok = False
+            if not job.reports or not ok:
+                self.done(job.name, ok)
+        self._arm()
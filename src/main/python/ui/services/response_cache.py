@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qsl
+
+# In-process cache of JSON API responses shared by every widget. Keys are
+# built from the endpoint and normalized coordinates so that the air and
+# weather pages asking for the same place get one upstream call.
+
+# Seconds a response stays fresh, per endpoint path
+ENDPOINT_TTLS = {
+    "/data/2.5/weather": 10 * 60,
+    "/data/2.5/forecast/hourly": 30 * 60,
+    "/data/2.5/forecast/daily": 60 * 60,
+    "/data/2.5/air_pollution": 15 * 60,
+}
+DEFAULT_TTL = 5 * 60
+MAX_BYTES = 8 * 1024 * 1024
+COORD_DECIMALS = 2            # ~1 km, finer than any of the forecast grids
+IGNORED_PARAMS = {"appid"}
+
+
+def normalize_key(url, params=None):
+    parts = urlsplit(url)
+    query = dict(parse_qsl(parts.query))
+    if params:
+        query.update({k: str(v) for k, v in params.items()})
+    for coord in ("lat", "lon"):
+        if coord in query:
+            try:
+                query[coord] = f"{float(query[coord]):.{COORD_DECIMALS}f}"
+            except ValueError:
+                pass
+    items = tuple(sorted((k, v) for k, v in query.items() if k not in IGNORED_PARAMS))
+    return parts.path, items
+
+
+class ResponseCache:
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_bytes=MAX_BYTES):
+        self.ttls = dict(ENDPOINT_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0              # served by another caller's in-flight fetch
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (expires_at, size, payload)
+        self._bytes = 0
+        self._inflight = {}             # key -> threading.Event
+        self._lock = threading.Lock()
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, key):
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key, payload, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._store(key, payload, size)
+
+    def get_or_fetch(self, key, fetch):
+        """Return a fresh cached payload or call fetch() -> (payload, size, cacheable).
+
+        Concurrent callers asking for the same key wait for the first
+        fetch instead of issuing a duplicate request. Every call is counted
+        once: as a hit, as coalesced into another caller's fetch, or as a miss.
+        """
+        waited = False
+        while True:
+            with self._lock:
+                payload = self._lookup(key, count=False)
+                if payload is not None:
+                    if waited:
+                        self.coalesced += 1
+                    else:
+                        self.hits += 1
+                    return payload
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            waited = True
+            event.wait()
+        try:
+            payload, size, cacheable = fetch()
+            if cacheable and size <= self.max_bytes:
+                with self._lock:
+                    self._store(key, payload, size)
+            return payload
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.coalesced + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.coalesced) / total if total else 0.0,
+            }
+
+    # Callers hold self._lock for the helpers below
+
+    def _lookup(self, key, count=True):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, size, payload = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return payload
+            del self._entries[key]
+            self._bytes -= size
+        if count:
+            self.misses += 1
+        return None
+
+    def _store(self, key, payload, size):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (time.monotonic() + self.ttl_for(key[0]), size, payload)
+        self._bytes += size
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, old_size, _) = self._entries.popitem(last=False)
+            self._bytes -= old_size
+            self.evictions += 1
@@ -0,0 +1,165 @@
+import time
+from functools import partial
+
+from PyQt5.QtCore import QObject, QRunnable, QTimer, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QIcon, QImage, QPixmap, QPixmapCache
+
+from ui.services import http_client, openweather
+from ui.services.city_index import get_city_index
+from ui.services.io_pool import io_pool
+from ui.services.location_service import LocationService
+
+ICON_DIR = "src/main/python/ui/resources/icons/"
+PRELOAD_ICONS = [
+    "EMCS_icons.png", "home-icon.png", "air_quality.png",
+    "water_quality.png", "weather_forecast.png", "exit_button.png",
+]
+MAX_PRELOAD_MS = 5000   # never hold the splash longer than this waiting on the network
+
+
+class StartupTimer:
+    """Collects named spans from process start to the first window paint."""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = {}   # name -> [start, end]
+
+    def begin(self, name):
+        self.spans[name] = [time.perf_counter(), None]
+
+    def end(self, name):
+        if name in self.spans:
+            self.spans[name][1] = time.perf_counter()
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.spans[name] = [now, now]
+
+    def report(self):
+        lines = ["[Startup] timing report (ms since launch / duration)"]
+        for name, (start, end) in sorted(self.spans.items(), key=lambda item: item[1][0]):
+            offset = (start - self.origin) * 1000
+            if end is None:
+                lines.append(f"  {name:<28} {offset:8.1f}   (unfinished)")
+            else:
+                lines.append(f"  {name:<28} {offset:8.1f}   {(end - start) * 1000:8.1f}")
+        lines.append(f"  {'total':<28} {(time.perf_counter() - self.origin) * 1000:8.1f}")
+        return "\n".join(lines)
+
+
+timer = StartupTimer()
+
+
+def cached_icon(path):
+    # Icons decoded during the splash are served from QPixmapCache
+    pixmap = QPixmapCache.find(path)
+    if pixmap is None or pixmap.isNull():
+        return QIcon(path)
+    return QIcon(pixmap)
+
+
+class TaskSignals(QObject):
+    done = pyqtSignal(str, object, str)   # task name, result, error message
+
+
+class CallableTask(QRunnable):
+    def __init__(self, name, fn):
+        super().__init__()
+        self.name = name
+        self.fn = fn
+        self.signals = TaskSignals()
+
+    @pyqtSlot()
+    def run(self):
+        try:
+            result = self.fn()
+        except Exception as e:
+            self.signals.done.emit(self.name, None, str(e))
+            return
+        self.signals.done.emit(self.name, result, "")
+
+
+def load_icon_images():
+    # QImage decoding is thread safe; the QPixmap conversion happens on the GUI thread
+    return {ICON_DIR + name: QImage(ICON_DIR + name) for name in PRELOAD_ICONS}
+
+
+def warm_response_cache(lat, lon):
+    http_client.get_json(openweather.current_weather_url(lat, lon))
+    http_client.get_json(openweather.air_pollution_url(lat, lon))
+
+
+class Preloader(QObject):
+    """Runs the startup work in parallel and reports when all of it is done."""
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    def __init__(self, max_wait_ms=MAX_PRELOAD_MS, parent=None):
+        super().__init__(parent)
+        self.max_wait_ms = max_wait_ms
+        self.pending = set()
+        self.tasks = []
+        self.done = False
+
+    def start(self):
+        timer.begin("preload")
+        self.progress.emit("Loading Environmental Monitoring System...")
+
+        self.run_task("assets", load_icon_images, "Loading assets...")
+        # The location is read here, on the GUI thread, so the service is never created on a pool thread
+        lat, lon, _ = LocationService.instance().current()
+        self.run_task("cache warm-up", partial(warm_response_cache, lat, lon), "Fetching latest readings...")
+        self.run_task("city index", get_city_index().refresh, "Loading city index...")
+        self.start_location()
+
+        QTimer.singleShot(self.max_wait_ms, self.finish)
+
+    def run_task(self, name, fn, message):
+        self.pending.add(name)
+        timer.begin(name)
+        self.progress.emit(message)
+        task = CallableTask(name, fn)
+        task.setAutoDelete(False)
+        task.signals.done.connect(self.on_task_done)
+        self.tasks.append(task)
+        io_pool().start(task)
+
+    def start_location(self):
+        service = LocationService.instance()
+        timer.begin("location")
+        if not service.resolve():
+            timer.end("location")
+            return
+        self.pending.add("location")
+        self.progress.emit("Resolving location...")
+        service.location_changed.connect(self.on_location_done)
+        service.resolve_failed.connect(self.on_location_done)
+
+    def on_location_done(self, *args):
+        self.complete("location")
+
+    def on_task_done(self, name, result, error):
+        if error:
+            print(f"[Preload] {name} failed:", error)
+        elif name == "assets":
+            for path, image in result.items():
+                if not image.isNull():
+                    QPixmapCache.insert(path, QPixmap.fromImage(image))
+        self.complete(name)
+
+    def complete(self, name):
+        if name not in self.pending:
+            return
+        self.pending.discard(name)
+        timer.end(name)
+        if not self.pending:
+            self.finish()
+
+    def finish(self):
+        if self.done:
+            return
+        self.done = True
+        timer.end("preload")
+        self.progress.emit("Starting...")
+        self.finished.emit()
@@ -1,17 +1,37 @@
+import time
+
 from PyQt5.QtWidgets import QSplashScreen
 from PyQt5.QtGui import QPixmap, QFont
 from PyQt5.QtCore import Qt, QTimer
 
+from ui.services.startup import Preloader, timer
+
+MIN_DISPLAY_MS = 800   # keep the splash readable even when preload is instant
+
 class SplashScreen(QSplashScreen):
-    def __init__(self):
+    def __init__(self, min_display_ms=MIN_DISPLAY_MS):
         super().__init__(QPixmap("src/main/python/ui/resources/icons/210.png")) # path of your image file (png)
         self.setFont(QFont("Arial", 16))
+        self.min_display_ms = min_display_ms
+        self.preloader = Preloader(parent=self)
+        self.preloader.progress.connect(self.show_progress)
         self.showMessage("Loading Environmental Monitoring System...", Qt.AlignBottom | Qt.AlignLeft, Qt.black)
 
+    def show_progress(self, message):
+        self.showMessage(message, Qt.AlignBottom | Qt.AlignLeft, Qt.black)
+
     def start(self, main_window_callback):
         self.show()
-        # Wait 2.5 seconds before launching the main window
-        QTimer.singleShot(3000, lambda: self._finish(main_window_callback))
+        timer.mark("splash shown")
+        self.shown_at = time.monotonic()
+        # Close as soon as the preload is done, but not before the minimum display time
+        self.preloader.finished.connect(lambda: self._wait_minimum(main_window_callback))
+        self.preloader.start()
+
+    def _wait_minimum(self, callback):
+        elapsed_ms = (time.monotonic() - self.shown_at) * 1000
+        remaining = max(0, int(self.min_display_ms - elapsed_ms))
+        QTimer.singleShot(remaining, lambda: self._finish(callback))
 
     def _finish(self, callback):
         self.close()
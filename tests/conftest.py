@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app imports its packages as "ui.…" from src/main/python
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "src", "main", "python"))
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from ui.services.alert_rules import DEFAULT_RULES, RuleEngine
+
+METRICS = ("ph", "do", "turbidity")
+RULES = [
+    {"id": "ph-range", "metric": "ph", "outside": [6.5, 8.5], "hysteresis": 0.1, "debounce": 3, "severity": "warning"},
+    {"id": "do-low", "metric": "do", "below": 5.0, "hysteresis": 0.3, "debounce": 2, "severity": "warning"},
+    {"id": "turbidity-spike", "metric": "turbidity", "above": 50.0, "hysteresis": 5.0, "severity": "critical"},
+]
+
+
+class ReferenceEngine:
+    """The rules applied one reading at a time, in arrival order."""
+
+    def __init__(self, rules, metrics):
+        self.rules = rules
+        self.metrics = metrics
+        self.active = {}
+        self.streak = {}
+
+    def evaluate(self, timestamps, stations, values):
+        alerts = []
+        for ts, station, row in zip(timestamps, stations, np.asarray(values, dtype=np.float32)):
+            for rule in self.rules:
+                x = row[self.metrics.index(rule["metric"])]
+                if "outside" in rule:
+                    low, high = rule["outside"]
+                elif "above" in rule:
+                    low, high = -np.inf, rule["above"]
+                else:
+                    low, high = rule["below"], np.inf
+                h = rule.get("hysteresis", 0.0)
+                key = (rule["id"], int(station))
+                breach = x < np.float32(low) or x > np.float32(high)
+                self.streak[key] = self.streak.get(key, 0) + 1 if breach else 0
+                was = self.active.get(key, False)
+                if breach and self.streak[key] >= rule.get("debounce", 1):
+                    now = True
+                elif np.float32(low + h) < x < np.float32(high - h):
+                    now = False
+                else:
+                    now = was
+                if now != was:
+                    alerts.append((rule["id"], int(station), float(ts), now))
+                self.active[key] = now
+        return alerts
+
+
+def readings(n, stations, seed):
+    rng = np.random.default_rng(seed)
+    values = np.column_stack([
+        7.5 + 1.2 * rng.standard_normal(n),
+        5.5 + 0.8 * rng.standard_normal(n),
+        30 + 20 * rng.standard_normal(n),
+    ]).astype(np.float32)
+    values[rng.random((n, 3)) < 0.03] = np.nan
+    return np.arange(n, dtype=np.float64), rng.integers(0, stations, n), values
+
+
+def summary(alerts):
+    return sorted((a.rule_id, a.station, a.ts, a.raised) for a in alerts)
+
+
+@pytest.mark.parametrize("batch", [1, 7, 250, 2000])
+def test_vectorized_matches_per_sample_reference(batch):
+    ts, stations, values = readings(2000, stations=4, seed=batch)
+    engine = RuleEngine(RULES, METRICS)
+    reference = ReferenceEngine(RULES, METRICS)
+    for start in range(0, len(ts), batch):
+        part = slice(start, start + batch)
+        got = summary(engine.evaluate(ts[part], stations[part], values[part]))
+        assert got == sorted(reference.evaluate(ts[part], stations[part], values[part]))
+    for station in range(4):
+        expected = {rule_id for (rule_id, s), on in reference.active.items() if s == station and on}
+        assert {rule["id"] for rule in engine.active_rules(station)} == expected
+
+
+def test_debounce_and_hysteresis():
+    engine = RuleEngine(RULES, METRICS)
+    ph = [9.0, 9.0, 9.0, 8.45, 8.3]
+    values = np.array([[v, 7.0, 1.0] for v in ph], dtype=np.float32)
+    alerts = engine.evaluate(np.arange(5.0), np.zeros(5), values)
+    # Raised on the third breach; 8.45 is inside the limit but not past the hysteresis band
+    assert [(a.ts, a.raised) for a in alerts] == [(2.0, True), (4.0, False)]
+
+
+def test_evaluate_one_skips_missing_metrics():
+    engine = RuleEngine(DEFAULT_RULES, ("pm2_5", "pm10"))
+    alerts = engine.evaluate_one({"pm2_5": 75.0, "pm10": None}, station=3)
+    assert [a.rule_id for a in alerts] == ["pm2_5-naaqs"]
+    assert [r["id"] for r in engine.active_rules(3)] == ["pm2_5-naaqs"]
+
+
+def test_unknown_severity_is_rejected():
+    with pytest.raises(ValueError):
+        RuleEngine([{"id": "x", "metric": "ph", "above": 1, "severity": "loud"}], METRICS)
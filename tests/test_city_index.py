@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from ui.services.city_index import CityIndex, allowed_distance, edit_distance  # noqa: E402
+
+CITIES = {
+    "kolkata": {"lat": 22.57, "lon": 88.36},
+    "bello": {"lat": 6.33, "lon": -75.56},
+    "aba": {"lat": 5.11, "lon": 7.37},
+    "zao": {"lat": 0.0, "lon": 0.0},
+    "ranchi": {"lat": 23.34, "lon": 85.31},
+    "hyderabad": {"lat": 17.38, "lon": 78.48},
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = tmp_path / "location.json"
+    path.write_text(json.dumps({"cities": CITIES}))
+    return CityIndex(str(path))
+
+
+def test_exact_and_prefix(index):
+    assert index.lookup(" Kolkata ")["name"] == "kolkata"
+    assert index.prefix("h") == ["hyderabad"]
+
+
+def test_typos_are_tolerated_in_long_names(index):
+    assert index.lookup("kolkatta")["name"] == "kolkata"
+    assert index.lookup("hyderbad")["name"] == "hyderabad"
+
+
+@pytest.mark.parametrize("query", ["zz", "abc", "hello", "rnachix", "elloo"])
+def test_unrelated_words_are_not_found(index, query):
+    assert index.lookup(query) is None
+
+
+def test_allowed_distance_scales_with_length():
+    assert [allowed_distance("x" * n) for n in (3, 4, 7, 8, 12)] == [0, 1, 1, 2, 2]
+    assert edit_distance("ranhci", "ranchi", 2) == 1
+
+
+def test_reload_publishes_names_through_the_signal(index):
+    published = []
+    index.signals.names_changed.connect(published.append)
+    assert index.refresh()
+    assert not index.refresh()      # unchanged file is not re-parsed
+    assert published == [sorted(CITIES)]
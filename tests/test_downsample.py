@@ -0,0 +1,61 @@
+import numpy as np
+
+from ui.modules.water_quality.downsample import FACTOR, DownsampledSeries, lttb, minmax
+from ui.modules.water_quality.ring_buffer import RingBuffer
+
+CAPACITY = 1000
+
+
+def series(n, archive=None):
+    raw_ts, raw_values = RingBuffer(CAPACITY, np.float64), RingBuffer(CAPACITY, np.float32)
+    ts = np.arange(n, dtype=np.float64)
+    values = np.sin(ts / 50).astype(np.float32)
+    downsampled = DownsampledSeries(raw_ts, raw_values, levels=3, capacity=CAPACITY, archive=archive)
+    for chunk in np.array_split(np.arange(n), 20):
+        raw_ts.extend(ts[chunk])
+        raw_values.extend(values[chunk])
+        downsampled.extend(ts[chunk], values[chunk])
+    return downsampled, ts, values
+
+
+def test_every_tier_reaches_factor_times_further_back():
+    downsampled, ts, _ = series(600_000)
+    spans = [tier.ts.last()[-1] - tier.ts.last()[0] for tier in downsampled.tiers["LTTB"]]
+    for finer, coarser in zip(spans, spans[1:]):
+        assert coarser / finer > FACTOR * 0.9
+
+
+def test_old_narrow_window_is_read_from_the_archive():
+    calls = []
+
+    def archive(start, end, max_points):
+        calls.append((start, end))
+        x = np.arange(start, end)
+        return x, np.sin(x / 50).astype(np.float32)
+
+    downsampled, ts, _ = series(200_000, archive)
+    x, y = downsampled.view(10_000, 12_000, 500)
+    assert calls == [(10_000, 12_000)]
+    assert 400 <= len(x) <= 500 and x[0] == 10_000 and x[-1] == 11_999
+
+
+def test_without_archive_falls_back_to_a_coarser_tier():
+    downsampled, ts, _ = series(200_000)
+    x, _ = downsampled.view(10_000, 12_000, 500)
+    assert 0 < len(x) < 500
+
+
+def test_recent_window_comes_from_memory():
+    downsampled, ts, values = series(50_000, archive=lambda *args: None)
+    x, y = downsampled.view(49_500, 49_999, 1000)
+    np.testing.assert_array_equal(x, ts[49_499:])
+    np.testing.assert_array_equal(y, values[49_499:])
+
+
+def test_reducers_keep_endpoints_and_budget():
+    x = np.arange(10_000, dtype=np.float64)
+    y = np.random.default_rng(0).standard_normal(10_000)
+    picked = lttb(x, y, 300)
+    assert len(picked) <= 300 and picked[0] == 0 and picked[-1] == len(x) - 1
+    picked = minmax(x, y, 300)
+    assert len(picked) < 350 and y.argmax() in picked and y.argmin() in picked
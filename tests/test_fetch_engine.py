@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from ui.services.fetch_engine import FetchEngine  # noqa: E402
+
+
+def test_empty_submit_finishes_the_batch_at_once():
+    engine = FetchEngine()
+    finished = []
+    engine.batch_finished.connect(lambda results, errors: finished.append((results, errors)))
+    engine.submit({})
+    assert finished == [({}, {})]
+    assert not engine.is_busy()
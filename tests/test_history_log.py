@@ -0,0 +1,144 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from ui.modules.water_quality import history_log
+from ui.modules.water_quality.history_log import HistoryLog
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+
+DAY = time.time() // 86400 * 86400   # inside the retention window
+
+
+def readings(ts, value=1.0):
+    return np.full((len(ts), len(PARAMETER_KEYS)), value, dtype=np.float32)
+
+
+def count(log, start, end, station=None):
+    return sum(len(chunk) for chunk in log.query(start, end, station))
+
+
+def all_ts(log):
+    return np.concatenate([chunk["ts"] for chunk in log.query(DAY, DAY + 86400)])
+
+
+def test_unsorted_batch_is_stored_in_time_order(tmp_path):
+    log = HistoryLog(str(tmp_path))
+    ts = DAY + np.random.default_rng(1).permutation(5000).astype(np.float64)
+    log.append(ts, readings(ts))
+    assert np.all(np.diff(all_ts(log)) >= 0)
+    assert count(log, DAY + 1000, DAY + 2000) == 1000
+
+
+def test_lagging_station_is_merged(tmp_path, monkeypatch):
+    # Small index stride so merges cross index entries
+    monkeypatch.setattr(history_log, "INDEX_STRIDE", 64)
+    log = HistoryLog(str(tmp_path))
+    # Station 0 is on time, station 1's clock runs 30 s behind; batches interleave both
+    for second in range(60):
+        on_time = DAY + second + np.arange(50) / 50
+        late = on_time - 30
+        log.append(np.r_[on_time, late], readings(np.r_[on_time, late]), np.r_[np.zeros(50), np.ones(50)])
+
+    assert np.all(np.diff(all_ts(log)) >= 0)
+    assert count(log, DAY - 30, DAY - 20) == 500          # lands in the previous day's segment
+    assert count(log, DAY + 20, DAY + 50) == 1500 + 500
+    assert count(log, DAY + 20, DAY + 30, station=1) == 500
+
+
+def test_merge_survives_reopen(tmp_path):
+    log = HistoryLog(str(tmp_path))
+    log.append(DAY + np.arange(100.0), readings(np.arange(100)))
+    log.append(DAY + np.arange(0.5, 10), readings(np.arange(10), 2.0))
+    log.close()
+
+    reopened = HistoryLog(str(tmp_path))
+    ts = all_ts(reopened)
+    assert len(ts) == 110
+    assert np.all(np.diff(ts) >= 0)
+    assert count(reopened, DAY + 0.5, DAY + 1) == 1
+
+
+def lagging_log(tmp_path, monkeypatch, max_late=100):
+    monkeypatch.setattr(history_log, "MAX_LATE_RECORDS", max_late)
+    monkeypatch.setattr(history_log, "INDEX_STRIDE", 64)
+    log = HistoryLog(str(tmp_path))
+    log.append(DAY + np.arange(1000.0), readings(np.arange(1000)))
+    return log
+
+
+def test_late_records_leave_the_segment_append_only(tmp_path, monkeypatch):
+    log = lagging_log(tmp_path, monkeypatch)
+    segment = next(iter(log.segments.values()))
+    before = open(segment.path, "rb").read()
+    log.append(DAY + np.arange(0.5, 50), readings(np.arange(50), 2.0))
+    assert open(segment.path, "rb").read() == before
+    assert count(log, DAY, DAY + 1000) == 1050
+    assert np.all(np.diff(all_ts(log)) >= 0)
+
+
+def test_side_file_is_folded_in_past_the_limit(tmp_path, monkeypatch):
+    log = lagging_log(tmp_path, monkeypatch)
+    segment = next(iter(log.segments.values()))
+    for offset in range(0, 150, 50):
+        log.append(DAY + np.arange(offset, offset + 50) + 0.5, readings(np.arange(50), 2.0))
+    assert not segment.late_runs and not os.path.exists(segment.late_path)
+    assert segment.count == 1150
+    log.append(DAY + np.arange(1000.0, 1010), readings(np.arange(10)))   # appends continue after the fold
+    log.close()
+
+    ts = all_ts(HistoryLog(str(tmp_path)))
+    assert len(ts) == 1160 and np.all(np.diff(ts) >= 0)
+
+
+class Crash(Exception):
+    pass
+
+
+def test_crash_before_the_rename_keeps_the_old_segment(tmp_path, monkeypatch):
+    log = lagging_log(tmp_path, monkeypatch)
+    log.append(DAY + np.arange(0.5, 60), readings(np.arange(60), 2.0))
+
+    def crash(*args):
+        raise Crash()
+
+    monkeypatch.setattr(history_log.os, "replace", crash)
+    with pytest.raises(Crash):
+        log.append(DAY + np.arange(100.5, 160), readings(np.arange(60), 2.0))
+    monkeypatch.undo()
+
+    reopened = HistoryLog(str(tmp_path))
+    ts = all_ts(reopened)
+    assert len(ts) == 1120 and np.all(np.diff(ts) >= 0)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(history_log.TMP_SUFFIX)]
+
+
+def test_crash_after_the_rename_drops_the_folded_side_file(tmp_path, monkeypatch):
+    log = lagging_log(tmp_path, monkeypatch)
+    log.append(DAY + np.arange(0.5, 60), readings(np.arange(60), 2.0))
+
+    def crash(*args):
+        raise Crash()
+
+    monkeypatch.setattr(history_log.os, "remove", crash)
+    with pytest.raises(Crash):
+        log.append(DAY + np.arange(100.5, 160), readings(np.arange(60), 2.0))
+    monkeypatch.undo()
+
+    # Both the new segment and the side file hold the late records; they must count once
+    reopened = HistoryLog(str(tmp_path))
+    ts = all_ts(reopened)
+    assert len(ts) == 1120 and np.all(np.diff(ts) >= 0)
+    assert not any(segment.late_runs for segment in reopened.segments.values())
+
+
+def test_torn_side_file_is_recovered(tmp_path, monkeypatch):
+    log = lagging_log(tmp_path, monkeypatch, max_late=1000)
+    log.append(DAY + np.arange(0.5, 60), readings(np.arange(60), 2.0))
+    segment = next(iter(log.segments.values()))
+    with open(segment.late_path, "ab") as f:
+        f.write(b"\x00" * (history_log.RECORD_SIZE // 2))
+
+    ts = all_ts(HistoryLog(str(tmp_path)))
+    assert len(ts) == 1060 and np.all(np.diff(ts) >= 0)
@@ -0,0 +1,103 @@
+import socket
+import time
+
+import numpy as np
+import pytest
+
+from ui.modules.water_quality.ingestion import (
+    LoopbackMqttClient, MqttSource, SampleQueue, SerialSource, UdpSource, format_frame, parse_frame, to_arrays,
+)
+
+VALUES = (7.1, 8.2, 21.5, 450.0, 4.2, 610.0)
+FRAME = format_frame(1000.0, 3, VALUES)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def assert_samples(queue, n):
+    samples = queue.drain()
+    assert len(samples) == n
+    for ts, station, values in samples:
+        assert (ts, station) == (1000.0, 3)
+        assert values == pytest.approx(VALUES)
+
+
+def test_parse_frame_csv_and_json():
+    assert parse_frame(FRAME) == (1000.0, 3, pytest.approx(VALUES))
+    assert parse_frame('{"station": 2, "ph": 7, "do": 8, "temperature": 20, "tds": 400, '
+                       '"turbidity": 3, "conductivity": 600}', received_at=5.0)[:2] == (5.0, 2)
+    assert parse_frame(",1," + ",".join(["1"] * 6), received_at=5.0)[:2] == (5.0, 1)
+
+
+@pytest.mark.parametrize("line", [
+    "", "garbage", "1.0,3,7.1", "1.0,x,1,2,3,4,5,6", '{"station": 1}',
+    "1.0,-1,1,2,3,4,5,6", f"1.0,{1 << 32},1,2,3,4,5,6",
+])
+def test_parse_frame_rejects(line):
+    assert parse_frame(line) is None
+
+
+def test_to_arrays_skips_samples_that_do_not_fit():
+    good = (1.0, 3, VALUES)
+    ts, stations, values, skipped = to_arrays([good, (2.0, -1, VALUES), (3.0, 4, VALUES[:2]), good])
+    assert skipped == 2
+    np.testing.assert_array_equal(ts, [1.0, 1.0])
+    assert stations.dtype == np.uint32 and values.shape == (2, len(VALUES))
+
+
+def test_queue_counts_drops_when_full():
+    queue = SampleQueue(capacity=2)
+    assert [queue.put(i) for i in range(3)] == [True, True, False]
+    assert (queue.accepted, queue.dropped) == (2, 1)
+    assert queue.drain(1) == [0] and len(queue) == 1
+
+
+def test_udp_source():
+    queue = SampleQueue()
+    udp = UdpSource("127.0.0.1", 0)
+    udp.start(queue)
+    try:
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sender.sendto((FRAME * 3 + "garbage\n1.0,-1,1,2,3,4,5,6\n").encode(), udp.address)
+        sender.close()
+        assert wait_for(lambda: udp.frames + udp.parse_errors == 5)
+    finally:
+        udp.stop()
+    assert (udp.frames, udp.parse_errors, queue.dropped) == (3, 2, 0)
+    assert_samples(queue, 3)
+
+
+def test_loopback_mqtt_source():
+    queue = SampleQueue(capacity=2)
+    client = LoopbackMqttClient()
+    mqtt = MqttSource(client=client)
+    mqtt.start(queue)
+    try:
+        assert wait_for(lambda: "emcs/water" in client.topics)
+        client.publish("emcs/water", FRAME * 3 + "garbage\n")
+        client.publish("other/topic", FRAME)
+        assert wait_for(lambda: mqtt.frames + mqtt.parse_errors == 4)
+    finally:
+        mqtt.stop()
+    assert (mqtt.frames, mqtt.parse_errors) == (3, 1)
+    assert (queue.accepted, queue.dropped) == (2, 1)
+    assert_samples(queue, 2)
+
+
+def test_serial_loop_source():
+    pytest.importorskip("serial")
+    queue = SampleQueue()
+    serial = SerialSource("loop://")
+    serial.start(queue)
+    try:
+        serial.port.write((FRAME + "garbage\n" + FRAME).encode() + b"partial")
+        assert wait_for(lambda: serial.frames + serial.parse_errors == 3)
+    finally:
+        serial.stop()
+    assert (serial.frames, serial.parse_errors, queue.dropped) == (2, 1, 0)
+    assert_samples(queue, 2)
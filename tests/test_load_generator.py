@@ -0,0 +1,34 @@
+import numpy as np
+
+from ui.modules.water_quality.load_generator import BLOCK, LoadGenerator
+
+
+def stream(sizes, seed=7, stations=5):
+    generator = LoadGenerator(rate=1000, stations=stations, seed=seed, start=1000.0)
+    parts = [generator.generate(n) for n in sizes]
+    return tuple(np.concatenate([part[i] for part in parts]) for i in range(3))
+
+
+def test_same_seed_same_stream_regardless_of_batching():
+    reference = stream([300])
+    for sizes in ([100, 200], [1] * 300, [7, 0, 150, 143]):
+        for expected, actual in zip(reference, stream(sizes)):
+            np.testing.assert_array_equal(expected, actual)
+
+
+def test_batches_across_block_boundaries():
+    total = 2 * BLOCK + 17
+    reference = stream([total])
+    for expected, actual in zip(reference, stream([BLOCK - 1, 2, BLOCK, 16])):
+        np.testing.assert_array_equal(expected, actual)
+
+
+def test_stations_and_timestamps_follow_the_sample_index():
+    ts, stations, values = stream([50], stations=4)
+    np.testing.assert_array_equal(stations, np.arange(50) % 4)
+    np.testing.assert_allclose(ts, 1000.0 + np.arange(1, 51) / 1000)
+    assert values.shape == (50, values.shape[1]) and np.all(values >= 0)
+
+
+def test_different_seeds_differ():
+    assert not np.array_equal(stream([100], seed=1)[2], stream([100], seed=2)[2])
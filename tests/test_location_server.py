@@ -0,0 +1,87 @@
+import importlib
+import json
+import sys
+
+import pytest
+
+pytest.importorskip("flask")
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # The module opens location.json in the working directory on import
+    monkeypatch.chdir(tmp_path)
+    sys.modules.pop("ui.location_server", None)
+    module = importlib.import_module("ui.location_server")
+    module.store = module.LocationStore(path=str(tmp_path / "location.json"), flush_delay=60)
+    yield module
+    sys.modules.pop("ui.location_server", None)
+
+
+@pytest.fixture
+def client(server):
+    return server.app.test_client()
+
+
+def test_etag_match_returns_304(client):
+    first = client.get("/location/presets")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    again = client.get("/location/presets", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_etag_changes_after_update(client):
+    etag = client.get("/location/default").headers["ETag"]
+    assert client.post("/location?lat=10&lon=20&name=Somewhere").status_code == 200
+
+    fresh = client.get("/location/default", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.get_json()["name"] == "Somewhere"
+
+
+@pytest.mark.parametrize("query", ["lat=nan&lon=10", "lat=10&lon=inf", "lat=91&lon=0", "lat=0&lon=-181", "lat=1"])
+def test_update_location_rejects_invalid_coordinates(client, query):
+    assert client.post(f"/location?{query}").status_code == 400
+
+
+def test_batch_rejects_non_object_body(client):
+    res = client.post("/location/batch", data=json.dumps([{"name": "a", "lat": 1, "lon": 2}]),
+                      content_type="application/json")
+    assert res.status_code == 400
+
+
+def test_batch_reports_items_without_name(client, server):
+    locations = [{"name": "a", "lat": 1, "lon": 2}, {"lat": 3, "lon": 4}, {"name": 5, "lat": 3, "lon": 4}]
+    res = client.post("/location/batch", json={"locations": locations})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["accepted"] == 1
+    assert set(body["errors"]) == {"#1", "#2"}
+    assert list(server.store.get("devices")) == ["a"]
+
+
+def test_corrupt_file_is_moved_aside(tmp_path, server):
+    path = tmp_path / "broken.json"
+    path.write_text("{not json")
+    store = server.LocationStore(path=str(path))
+    assert store.get("selected") == server.get_default_location()["selected"]
+    assert (tmp_path / "broken.json.corrupt").read_text() == "{not json"
+
+
+def test_failed_write_keeps_the_update_for_the_next_flush(server, monkeypatch):
+    store = server.store
+    store.set("selected", {"name": "Here", "lat": 1.0, "lon": 2.0})
+    real_write = store._write
+
+    def broken(payload):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(store, "_write", broken)
+    store.flush()
+    monkeypatch.setattr(store, "_write", real_write)
+    store.flush()
+    with open(store.path) as f:
+        assert json.load(f)["selected"]["name"] == "Here"
@@ -0,0 +1,58 @@
+import pytest
+
+from ui.services import quota
+
+URL = "https://api.openweathermap.org/data/2.5/weather?lat=1&lon=2"
+
+
+def manager(minute=10):
+    return quota.QuotaManager({"api": {"minute": minute, "day": 1000}})
+
+
+def test_unlimited_hosts_pass_through():
+    limiter = manager(minute=1)
+    for _ in range(5):
+        limiter.acquire("https://ipinfo.io/json", timeout=0)
+    assert quota.endpoint_class("https://ipinfo.io/json") is None
+
+
+def test_background_leaves_a_reserve_for_urgent_requests():
+    limiter = manager(minute=10)
+    granted = 0
+    with pytest.raises(quota.QuotaExceeded):
+        while True:
+            limiter.acquire(URL, quota.BACKGROUND, timeout=0)
+            granted += 1
+    assert granted == 8      # 20 % of the bucket held back
+    assert limiter.try_acquire(URL, quota.URGENT)
+    assert limiter.try_acquire(URL, quota.URGENT)
+    assert not limiter.try_acquire(URL, quota.URGENT)
+
+    usage = limiter.usage()["api"]
+    assert usage["granted"] == {"urgent": 2, "background": 8}
+    assert usage["rejected"] == {"urgent": 1, "background": 1}
+
+
+def test_server_throttling_holds_the_endpoint_class():
+    limiter = manager()
+    limiter.note_response(URL, 200)
+    assert limiter.try_acquire(URL)
+    limiter.note_response(URL, 429, "0.2")
+    assert limiter.usage()["api"]["server_throttled"] == 1
+    assert not limiter.try_acquire(URL)
+    limiter.acquire(URL, quota.URGENT, timeout=1.0)     # waits out the Retry-After
+
+
+def test_throttling_without_retry_after_uses_the_default_pause():
+    limiter = manager()
+    limiter.note_response(URL, 429, "Wed, 21 Oct 2015 07:28:00 GMT")
+    with pytest.raises(quota.QuotaExceeded):
+        limiter.acquire(URL, quota.URGENT, timeout=quota.THROTTLE_SECONDS / 2)
+
+
+def test_bucket_refills_over_its_period():
+    bucket = quota.TokenBucket(60, 60)
+    bucket.tokens = 0.0
+    now = bucket.updated
+    assert bucket.wait_time(now) == pytest.approx(1.0)
+    assert bucket.wait_time(now + 1.0) == 0.0
@@ -0,0 +1,46 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from PyQt5.QtCore import QObject  # noqa: E402
+
+from ui.services.refresh_scheduler import RefreshScheduler  # noqa: E402
+
+
+class Page(QObject):
+    def __init__(self, visible):
+        super().__init__()
+        self.shown = visible
+
+    def isVisible(self):
+        return self.shown
+
+    def window(self):
+        return self
+
+    def isMinimized(self):
+        return False
+
+
+def test_run_when_shown_waits_for_the_widget():
+    scheduler = RefreshScheduler()
+    hidden = scheduler.register("hidden", lambda: None, 60, widget=Page(False), run_when_shown=True)
+    assert hidden.due is None and hidden.last_run is None
+    scheduler.stop()
+
+
+def test_run_when_shown_runs_a_visible_widget_right_away():
+    scheduler = RefreshScheduler()
+    calls = []
+    job = scheduler.register("shown", lambda: calls.append(1), 60, widget=Page(True), run_when_shown=True)
+    assert job.due is not None
+    scheduler.run_due()
+    assert calls == [1] and job.last_run is not None
+    scheduler.stop()
+
+
+def test_default_registration_waits_one_interval():
+    scheduler = RefreshScheduler()
+    job = scheduler.register("plain", lambda: None, 60, widget=Page(True))
+    assert job.last_run is not None and job.due >= job.last_run + 60 * 0.9
+    scheduler.stop()
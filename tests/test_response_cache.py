@@ -0,0 +1,64 @@
+import threading
+import time
+
+from ui.services.response_cache import ResponseCache, normalize_key
+
+
+def test_key_ignores_api_key_order_and_coordinate_noise():
+    a = normalize_key("https://x/data/2.5/weather?lat=22.57261&lon=88.3639&appid=one")
+    b = normalize_key("https://x/data/2.5/weather", {"appid": "two", "lon": 88.36391, "lat": 22.5726})
+    assert a == b == ("/data/2.5/weather", (("lat", "22.57"), ("lon", "88.36")))
+
+
+def test_entries_expire_after_their_ttl():
+    cache = ResponseCache(ttls={"/fast": 0.05})
+    cache.put(("/fast", ()), "payload", 10)
+    cache.put(("/slow", ()), "payload", 10)
+    assert cache.get(("/fast", ())) == "payload"
+    time.sleep(0.06)
+    assert cache.get(("/fast", ())) is None
+    assert cache.get(("/slow", ())) == "payload"
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    cache = ResponseCache(max_bytes=100)
+    for name in "abc":
+        cache.put((name, ()), name, 40)
+    assert cache.get(("a", ())) is None
+    cache.get(("b", ()))
+    cache.put(("d", ()), "d", 40)
+    assert cache.get(("b", ())) == "b" and cache.get(("c", ())) is None
+    assert cache.stats()["evictions"] == 2 and cache.stats()["bytes"] == 80
+
+
+def test_concurrent_callers_share_one_fetch():
+    cache = ResponseCache()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(1)
+        return {"ok": True}, 10, True
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_fetch(("/k", ()), fetch)))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1 and results == [{"ok": True}] * 5
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 0)
+    cache.get_or_fetch(("/k", ()), fetch)
+    assert cache.stats()["hits"] == 1 and len(calls) == 1
+
+
+def test_uncacheable_responses_are_not_stored():
+    cache = ResponseCache()
+    cache.get_or_fetch(("/k", ()), lambda: ("error", 5, False))
+    assert cache.get(("/k", ())) is None
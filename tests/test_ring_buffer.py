@@ -0,0 +1,42 @@
+import numpy as np
+
+from ui.modules.water_quality.ring_buffer import RingBuffer, SensorHistory
+
+
+def test_last_is_the_newest_values_in_order_across_wraps():
+    buffer = RingBuffer(10)
+    written = []
+    for size in (3, 4, 9, 1, 25):
+        chunk = np.arange(len(written), len(written) + size, dtype=np.float64)
+        buffer.extend(chunk)
+        written.extend(chunk)
+        np.testing.assert_array_equal(buffer.last(), written[-10:])
+        np.testing.assert_array_equal(buffer.last(4), written[-4:])
+        assert buffer.latest() == written[-1]
+    assert len(buffer) == 10
+
+
+def test_append_matches_extend():
+    a, b = RingBuffer(5), RingBuffer(5)
+    for v in range(12):
+        a.append(v)
+    b.extend(range(12))
+    np.testing.assert_array_equal(a.last(), b.last())
+
+
+def test_views_are_read_only():
+    buffer = RingBuffer(4)
+    buffer.extend([1, 2, 3])
+    view = buffer.last()
+    assert not view.flags.writeable
+
+
+def test_sensor_history_window():
+    history = SensorHistory(capacity=100, keys=("a", "b"))
+    ts = np.arange(50, dtype=np.float64)
+    history.extend(ts, np.column_stack([ts, -ts]))
+    window_ts, series = history.window(10)
+    np.testing.assert_array_equal(window_ts, np.arange(39, 50))
+    np.testing.assert_array_equal(series["b"], -np.arange(39, 50))
+    history.clear()
+    assert len(history) == 0 and history.timestamps.latest() is None
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from ui.modules.water_quality.rolling_stats import BUCKETS, RollingStats
+
+KEYS = ("a", "b")
+WINDOWS = {"short": 60, "long": 3600}
+
+
+def readings(n=5000, seed=3):
+    rng = np.random.default_rng(seed)
+    ts = 1_000_000.0 + np.cumsum(rng.exponential(1.5, n))
+    values = np.column_stack([7 + rng.standard_normal(n), 1000 + 50 * rng.standard_normal(n)]).astype(np.float32)
+    values[rng.random(n) < 0.05, 1] = np.nan
+    return ts, values
+
+
+def reference_ewma(ts, x, seconds):
+    ewma, last = None, None
+    for t, v in zip(ts, x):
+        if np.isnan(v):
+            continue
+        if ewma is None:
+            ewma = float(v)
+        else:
+            ewma += (1 - np.exp(-max(t - last, 0.0) / seconds)) * (v - ewma)
+        last = t
+    return ewma
+
+
+def check(stats, window, ts, values, inside):
+    for column, key in enumerate(KEYS):
+        result = stats.get(key, window)
+        x = values[inside, column].astype(np.float64)
+        x = x[~np.isnan(x)]
+        assert result["count"] == len(x)
+        assert result["min"] == pytest.approx(x.min())
+        assert result["max"] == pytest.approx(x.max())
+        assert result["mean"] == pytest.approx(x.mean(), rel=1e-9)
+        assert result["std"] == pytest.approx(x.std(ddof=1), rel=1e-6)
+        assert result["ewma"] == pytest.approx(reference_ewma(ts, values[:, column], WINDOWS[window]), rel=1e-6)
+
+
+def fed(ts, values, sizes):
+    stats = RollingStats(WINDOWS, KEYS)
+    for chunk in np.split(np.arange(len(ts)), np.cumsum(sizes)[:-1]):
+        stats.extend(ts[chunk], values[chunk])
+    return stats
+
+
+@pytest.mark.parametrize("sizes", [[5000], [1] * 50 + [4950], [1234, 3000, 766]])
+def test_windows_match_a_numpy_reference(sizes):
+    ts, values = readings()
+    stats = fed(ts, values, sizes)
+    now = ts[-1]
+    check(stats, "short", ts, values, ts > now - 60)
+    # The long window holds whole buckets, so it reaches back to the start of the oldest one
+    width = 3600 / BUCKETS
+    check(stats, "long", ts, values, np.floor(ts / width) > np.floor(now / width) - BUCKETS)
+
+
+def test_quiet_station_expires():
+    ts, values = readings(200)
+    stats = fed(ts, values, [200])
+    stats.expire(ts[-1] + 30)
+    assert stats.get("a", "short")["count"] == np.sum(ts > ts[-1] - 30)
+    stats.expire(ts[-1] + 3700)
+    assert stats.get("a", "short") is None
+    assert stats.get("b", "long") is None
+
+
+def test_update_accepts_one_reading():
+    stats = RollingStats(WINDOWS, KEYS)
+    stats.update(100.0, {"a": 2.0})
+    stats.update(101.0, {"a": 4.0, "b": 1.0})
+    assert stats.get("a", "short")["mean"] == pytest.approx(3.0)
+    assert stats.get("b", "long")["count"] == 1
+
+
+def test_short_window_aggregates_track_a_rescan_as_it_slides():
+    rng = np.random.default_rng(5)
+    n = 20000
+    ts = 1_000_000.0 + np.cumsum(rng.exponential(0.05, n))
+    # Few distinct values, so min/max see ties and long monotone runs
+    values = np.column_stack([np.round(7 + np.cumsum(rng.standard_normal(n)) * 0.01, 1),
+                              rng.integers(0, 5, n)]).astype(np.float32)
+    values[rng.random(n) < 0.1, 0] = np.nan
+    stats = RollingStats({"short": 10}, KEYS)
+    done = 0
+    for size in rng.integers(1, 400, n):
+        if done >= n:
+            break
+        part = slice(done, done + size)
+        stats.extend(ts[part], values[part])
+        done += size
+        inside = (ts[:done] > ts[:done].max() - 10)
+        for column, key in enumerate(KEYS):
+            x = values[:done][inside, column].astype(np.float64)
+            x = x[~np.isnan(x)]
+            result = stats.get(key, "short")
+            assert result["count"] == len(x)
+            assert (result["min"], result["max"]) == (x.min(), x.max())
+            assert result["mean"] == pytest.approx(x.mean(), rel=1e-9)
+            assert result["std"] == pytest.approx(x.std(ddof=1), rel=1e-6, abs=1e-9)
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from ui.modules.water_quality.station_model import StationTableModel  # noqa: E402
+from ui.modules.water_quality.wqi import compute_wqi  # noqa: E402
+
+
+def test_unchanged_readings_do_not_repaint():
+    model = StationTableModel()
+    changes = []
+    model.dataChanged.connect(lambda first, last, roles: changes.append((first.row(), last.row())))
+    values = np.array([[7.1, 8.2, 21.5, 450.0, 4.2, 610.0], [6.9, 7.5, 18.0, 500.0, 9.0, 700.0]])
+    ts = np.array([100.2, 100.4])
+    stations = np.array([0, 1], dtype=np.uint32)
+    wqi = compute_wqi(values).astype(np.float64)   # full precision, stored as float32
+
+    model.update(ts, stations, values, wqi)
+    assert len(changes) == 2
+    changes.clear()
+    model.update(ts + 0.5, stations, values, wqi)
+    assert changes == []
+
+    values[1, 0] = 7.0
+    model.update(ts + 0.5, stations, values, compute_wqi(values).astype(np.float64))
+    assert changes == [(1, 1)]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from ui.modules.water_quality.parameters import PARAMETER_KEYS
+from ui.modules.water_quality.wqi import STANDARDS, category, compute_wqi
+
+
+def reading(**values):
+    return np.array([values.get(key, np.nan) for key in PARAMETER_KEYS], dtype=np.float64)
+
+
+def reference_wqi(row):
+    # Brown et al. written out term by term over the scored parameters
+    total = weights = 0.0
+    inverse_sum = sum(1 / s[0] for s in STANDARDS.values() if s)
+    for key, value in zip(PARAMETER_KEYS, row):
+        if STANDARDS.get(key) is None or np.isnan(value):
+            continue
+        standard, ideal = STANDARDS[key]
+        q = 100 * (value - ideal) / (standard - ideal)
+        if key == "ph":
+            q = abs(q)
+        w = (1 / standard) / inverse_sum
+        total += q * w
+        weights += w
+    return total / weights if weights else np.nan
+
+
+def test_batch_matches_per_reading_reference():
+    rng = np.random.default_rng(0)
+    values = rng.uniform(0, 20, (500, len(PARAMETER_KEYS)))
+    values[rng.random(values.shape) < 0.2] = np.nan
+    expected = np.array([reference_wqi(row) for row in values])
+    np.testing.assert_allclose(compute_wqi(values), expected, rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(compute_wqi(values.reshape(5, 100, -1)), expected.reshape(5, 100), equal_nan=True)
+
+
+def test_ph_is_penalised_both_ways():
+    assert compute_wqi(reading(ph=6.0)) == compute_wqi(reading(ph=8.0))
+
+
+def test_unscored_reading_is_nan():
+    assert np.isnan(compute_wqi(reading(temperature=25.0)))
+    assert category(float(compute_wqi(reading(temperature=25.0)))) == "--"
+
+
+def test_categories():
+    assert [category(s) for s in (0, 25, 40, 80, 150)] == ["Excellent", "Excellent", "Good", "Very Poor", "Unsuitable"]